@@ -0,0 +1,209 @@
+"""
+In-process stand-ins for the Groq client and the Discord objects the session handlers use.
+They only implement what bot.py and intelligence.py call, with configurable latency and failure rates.
+"""
+
+import asyncio, itertools, json, random, re, time
+from collections import Counter
+from types import SimpleNamespace
+
+import groq
+import httpx
+
+_ids = itertools.count(1_000_000)
+_REQUEST = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+
+# what participants post in the benchmarks' threads
+ARGUMENTS = [
+    "Everyone I know supports this policy, so it must be the right one.",
+    "If we allow this, next we will have to allow everything else too.",
+    "The study shows a correlation between screen time and anxiety in teenagers.",
+    "My opponent has never worked in the industry, so their view does not count.",
+    "Either we ban it completely or we accept the consequences.",
+    "Historical records from the period describe the famine in consistent terms.",
+    "Experts disagree on the mechanism but agree on the measured effect.",
+    "Taxes on sugar reduced consumption in every country that tried them.",
+]
+
+SENTENCES = [
+    "The premise does not survive contact with the historical record.",
+    "You are treating correlation as if it settled causation.",
+    "Consider what follows if your principle is applied consistently.",
+    "That concession matters more than you admit.",
+    "The evidence you cite supports a narrower claim than the one you make.",
+]
+
+
+class FakeGroq:
+    """
+    Mimics `AsyncGroq().chat.completions.create` for every call type intelligence.py makes.
+    `latency` is the mean seconds per completion, `error_rate` the share of calls failing with a 429 or timeout,
+    `intervention_rate` how often fallacy verdicts intervene and `conclude_rate` how often a persona ends a simulation.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.3,
+        error_rate: float = 0.0,
+        intervention_rate: float = 0.3,
+        conclude_rate: float = 0.02,
+        chunk_delay: float = 0.02,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.intervention_rate = intervention_rate
+        self.conclude_rate = conclude_rate
+        self.chunk_delay = chunk_delay
+        self.calls = Counter()
+        self.errors = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, messages: list, model: str, stream: bool = False, **options):
+        self.calls[model] += 1
+        await asyncio.sleep(random.expovariate(1 / self.latency) if self.latency else 0)
+        if random.random() < self.error_rate:
+            self.errors += 1
+            if random.random() < 0.5:
+                raise groq.APITimeoutError(request=_REQUEST)
+            response = httpx.Response(429, headers={"retry-after": "0.05"}, request=_REQUEST)
+            raise groq.RateLimitError("Rate limit reached", response=response, body=None)
+
+        content = self._reply(messages, options)
+        if stream:
+            return FakeStream(content, self.chunk_delay)
+        usage = SimpleNamespace(
+            prompt_tokens=sum(len(message["content"]) for message in messages) // 4,
+            completion_tokens=len(content) // 4,
+        )
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage
+        )
+
+    def _reply(self, messages: list, options: dict) -> str:
+        last = messages[-1]["content"]
+        if options.get("response_format"):
+            batch = re.search(r"the last (\d+) messages arrived together", last)
+            if batch:
+                verdicts = [
+                    self._verdict() | {"message": number}
+                    for number in range(1, int(batch.group(1)) + 1)
+                ]
+                return json.dumps({"verdicts": verdicts})
+            return json.dumps(self._verdict())
+        if options.get("max_tokens") == 4:  # triage score
+            return str(random.randint(0, 100))
+        if "SIMULATION PARAMETERS" in messages[0]["content"] and random.random() < self.conclude_rate:
+            return "CONCLUDE: We have reached the limits of our axioms."
+        return " ".join(random.sample(SENTENCES, 3))
+
+    def _verdict(self) -> dict:
+        if random.random() < self.intervention_rate:
+            return {"intervene": True, "question": "<@1>, what supports that beyond the premise itself?"}
+        return {"intervene": False, "question": None}
+
+
+class FakeStream:
+    def __init__(self, content: str, chunk_delay: float):
+        self._words = iter(content.split(" "))
+        self.chunk_delay = chunk_delay
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        word = next(self._words, None)
+        if word is None:
+            raise StopAsyncIteration
+        await asyncio.sleep(self.chunk_delay)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(delta=SimpleNamespace(content=word + " "))]
+        )
+
+
+class FakeUser:
+    def __init__(self, name: str):
+        self.id = next(_ids)
+        self.name = name
+        self.mention = f"<@{self.id}>"
+
+    def __str__(self):
+        return self.name
+
+
+class FakeMessage:
+    def __init__(self, author: FakeUser, content: str, channel=None):
+        self.id = next(_ids)
+        self.author = author
+        self.content = content
+        self.clean_content = content
+        self.channel = channel
+
+    async def edit(self, content: str):
+        self.content = self.clean_content = content
+        return self
+
+    async def delete(self):
+        pass
+
+
+class FakeThread:
+    """
+    A thread that records what the bot posts. `on_send` is called with every bot message.
+    `api_latency` simulates the Discord REST round trip of each write.
+    """
+
+    def __init__(self, bot_user: FakeUser, api_latency: float = 0.05, on_send=None):
+        self.id = next(_ids)
+        self.guild = SimpleNamespace(id=next(_ids))
+        self.bot_user = bot_user
+        self.api_latency = api_latency
+        self.on_send = on_send
+        self.messages: list[FakeMessage] = []
+
+    async def send(self, content: str):
+        await asyncio.sleep(self.api_latency)
+        message = FakeMessage(self.bot_user, content, self)
+        self.messages.append(message)
+        if self.on_send:
+            self.on_send(self, message)
+        return message
+
+    async def edit(self, **options):
+        await asyncio.sleep(self.api_latency)
+
+    async def history(self, limit: int = 100):
+        await asyncio.sleep(self.api_latency)
+        for message in self.messages[-limit:][::-1]:
+            yield message
+
+    def post(self, author: FakeUser, content: str) -> FakeMessage:
+        """
+        A participant posting in the thread, the caller hands the message to the bot's on_message.
+        """
+        message = FakeMessage(author, content, self)
+        self.messages.append(message)
+        return message
+
+
+class FakeInteraction:
+    """
+    A slash-command invocation in `channel`. `first_reply` records when the bot first answered.
+    """
+
+    def __init__(self, user: FakeUser, channel: FakeThread):
+        self.id = next(_ids)
+        self.user = user
+        self.channel = channel
+        self.started = time.perf_counter()
+        self.first_reply = None
+        self.response = SimpleNamespace(defer=self._defer)
+        self.followup = SimpleNamespace(send=self._send)
+
+    async def _defer(self, ephemeral: bool = False):
+        await asyncio.sleep(self.channel.api_latency)
+
+    async def _send(self, content: str = "", ephemeral: bool = False, wait: bool = False, **options):
+        await asyncio.sleep(self.channel.api_latency)
+        if self.first_reply is None:
+            self.first_reply = time.perf_counter()
+        return FakeMessage(self.channel.bot_user, content, self.channel)
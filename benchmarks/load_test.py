@@ -0,0 +1,268 @@
+"""
+Offline load test: drives simulated /debate, /argue and /simulate sessions through bot.py's handlers,
+with fake Discord threads and a fake Groq client, and reports throughput, reaction latency, LLM calls per message
+and memory per session.
+
+    python benchmarks/load_test.py --debates 1000 --opponents 200 --argues 500 --simulations 100 --duration 60
+
+Nothing connects to Discord or Groq, so it runs without tokens or network and can be compared run to run.
+"""
+
+import argparse, asyncio, contextlib, json, os, random, sys, tempfile, time, tracemalloc
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# the bot's stores and API keys are read at import time, keep them away from real data
+os.environ.setdefault("LOGOS_DB_PATH", os.path.join(tempfile.mkdtemp(), "logos.db"))
+os.environ.setdefault("GROQ_API_KEY", "offline")
+os.environ.setdefault("JOURNAL_DIR", os.path.join(tempfile.mkdtemp(), "journal"))
+# sampled spans are still built and serialized, only their output is discarded
+os.environ.setdefault("TRACE_FILE", os.devnull)
+
+import bot, intelligence, journal
+from fakes import ARGUMENTS, FakeGroq, FakeInteraction, FakeThread, FakeUser
+from scheduler import MODEL_LIMITS, GroqScheduler
+from session_store import SessionStore
+
+
+def percentile(values: list, share: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(share * len(values)))]
+
+
+class LoadTest:
+    def __init__(self, arguments):
+        self.arguments = arguments
+        self.groq = FakeGroq(
+            latency=arguments.llm_latency,
+            error_rate=arguments.error_rate,
+            intervention_rate=arguments.intervention_rate,
+        )
+        self.bot_user = FakeUser("Logos")
+        self.deadline = 0.0
+        self.user_messages = 0
+        self.bot_messages = 0
+        self.sessions = Counter()
+        # per thread, the times of participant messages the bot has not reacted to yet
+        self.pending: dict[int, list] = defaultdict(list)
+        self.reaction_latencies: list[float] = []
+        self.argue_latencies: list[float] = []
+
+    def install(self):
+        """
+        Points bot.py and intelligence.py at the fakes.
+        """
+        intelligence.client = self.groq
+        limits = MODEL_LIMITS
+        if not self.arguments.groq_limits:
+            limits = {model: {"requests": 10**9, "tokens": 10**12} for model in MODEL_LIMITS}
+        intelligence.scheduler = intelligence.router.scheduler = GroqScheduler(
+            max_concurrency=self.arguments.concurrency, limits=limits
+        )
+        bot.session_store = SessionStore(":memory:")
+        bot.client._connection.user = self.bot_user
+        bot.SIMULATION_ROUND_DELAY = self.arguments.round_delay
+
+    def new_thread(self) -> FakeThread:
+        return FakeThread(self.bot_user, self.arguments.discord_latency, on_send=self.record_reply)
+
+    def record_reply(self, thread: FakeThread, message):
+        self.bot_messages += 1
+        now = time.perf_counter()
+        self.reaction_latencies.extend(now - posted for posted in self.pending.pop(thread.id, []))
+
+    async def think(self) -> bool:
+        """
+        Waits a random think time, returns False if the run ended meanwhile.
+        """
+        pause = random.expovariate(1 / self.arguments.think_time)
+        await asyncio.sleep(min(pause, max(0, self.deadline - time.perf_counter())))
+        return time.perf_counter() < self.deadline
+
+    async def participant_thread(self, thread: FakeThread, users: list):
+        """
+        Participants taking turns in a monitored thread until the run ends.
+        """
+        turn = 0
+        while await self.think():
+            author = users[turn % len(users)]
+            message = thread.post(author, random.choice(ARGUMENTS))
+            self.pending[thread.id].append(time.perf_counter())
+            self.user_messages += 1
+            await bot.on_message(message)
+            turn += 1
+
+    async def debate(self):
+        thread = self.new_thread()
+        self.sessions["debate"] += 1
+        session = asyncio.create_task(
+            bot.get_feedback_on_last_thread_message(thread=thread, topic="Sugar taxes")
+        )
+        await asyncio.sleep(0)
+        await self.participant_thread(thread, [FakeUser("alice"), FakeUser("bob")])
+        return session, thread
+
+    async def opponent(self):
+        thread = self.new_thread()
+        self.sessions["opponent"] += 1
+        session = asyncio.create_task(
+            bot.thread_with_logos_participating(thread=thread, topic="Free will")
+        )
+        await asyncio.sleep(0)
+        await self.participant_thread(thread, [FakeUser("carol")])
+        return session, thread
+
+    async def argue(self):
+        channel = self.new_thread()
+        user = FakeUser("dave")
+        for argument in random.sample(ARGUMENTS, 3):
+            channel.post(FakeUser("erin"), argument)
+        self.sessions["argue"] += 1
+        while await self.think():
+            interaction = FakeInteraction(user, channel)
+            self.user_messages += 1
+            await bot.argue.callback(interaction, random.choice(ARGUMENTS))
+            if interaction.first_reply is not None:
+                self.argue_latencies.append(interaction.first_reply - interaction.started)
+        return None, channel
+
+    async def simulation(self):
+        thread = self.new_thread()
+        self.sessions["simulate"] += 1
+        session = asyncio.create_task(
+            bot.monitor_simulated_thread(
+                thread, "The role of the state", "Hobbes", "Locke", "**AI Debate Simulation**"
+            )
+        )
+        await asyncio.sleep(max(0, self.deadline - time.perf_counter()))
+        return session, thread
+
+    async def run(self) -> dict:
+        arguments = self.arguments
+        self.install()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        self.deadline = started + arguments.duration
+
+        drivers = (
+            [self.debate() for _ in range(arguments.debates)]
+            + [self.opponent() for _ in range(arguments.opponents)]
+            + [self.argue() for _ in range(arguments.argues)]
+            + [self.simulation() for _ in range(arguments.simulations)]
+        )
+        results = await asyncio.gather(*drivers)
+        # sessions and threads are still alive here, which is the footprint a live bot carries
+        memory = tracemalloc.get_traced_memory()[0] - baseline
+        # let in-flight evaluations land before the sessions are stopped
+        await asyncio.sleep(arguments.drain)
+        elapsed = time.perf_counter() - started
+        tracemalloc.stop()
+
+        for session, _ in results:
+            if session is not None:
+                session.cancel()
+        await asyncio.gather(
+            *(session for session, _ in results if session is not None), return_exceptions=True
+        )
+        await journal.close()
+
+        calls = sum(self.groq.calls.values())
+        session_count = sum(self.sessions.values())
+        return {
+            "sessions": dict(self.sessions),
+            "elapsed": round(elapsed, 2),
+            "user_messages": self.user_messages,
+            "bot_messages": self.bot_messages,
+            "throughput": round(self.user_messages / elapsed, 2),
+            "reaction_latency": {
+                "count": len(self.reaction_latencies),
+                "p50": round(percentile(self.reaction_latencies, 0.5), 3),
+                "p99": round(percentile(self.reaction_latencies, 0.99), 3),
+            },
+            "argue_latency": {
+                "count": len(self.argue_latencies),
+                "p50": round(percentile(self.argue_latencies, 0.5), 3),
+                "p99": round(percentile(self.argue_latencies, 0.99), 3),
+            },
+            "llm_calls": dict(self.groq.calls),
+            "llm_errors": self.groq.errors,
+            "llm_calls_per_message": round(calls / max(1, self.user_messages), 3),
+            "memory_per_session": memory // max(1, session_count),
+            "scheduler": {
+                key: intelligence.scheduler.stats()[key]
+                for key in ("completed", "retries", "average_wait", "max_wait")
+            },
+            "routing": {
+                " ".join(labels): count for labels, count in intelligence.router.routed.items()
+            },
+            "models": intelligence.router.summary(),
+            "triage": intelligence.triage_stats.summary(),
+            "argue_cache": {
+                "hits": intelligence.argue_cache.hits,
+                "shared": intelligence.argue_cache.shared,
+                "misses": intelligence.argue_cache.misses,
+            },
+            "message_cache": bot.recent_messages.stats(),
+            "journal": {labels[0]: count for labels, count in journal.records_total.items()},
+        }
+
+
+def report(results: dict):
+    print(f"Sessions:              {results['sessions']}")
+    print(f"Elapsed:               {results['elapsed']} s")
+    print(f"Messages:              {results['user_messages']} in, {results['bot_messages']} out")
+    print(f"Throughput:            {results['throughput']} messages/s")
+    latency = results["reaction_latency"]
+    print(f"Reaction latency:      p50 {latency['p50']} s, p99 {latency['p99']} s ({latency['count']} replies)")
+    latency = results["argue_latency"]
+    print(f"/argue latency:        p50 {latency['p50']} s, p99 {latency['p99']} s ({latency['count']} replies)")
+    print(f"LLM calls per message: {results['llm_calls_per_message']} {results['llm_calls']}")
+    print(f"LLM errors injected:   {results['llm_errors']}")
+    print(f"Memory per session:    {results['memory_per_session'] / 1024:.1f} KiB")
+    print(f"Scheduler:             {results['scheduler']}")
+    print(f"Routing:               {results['routing']}")
+    print(f"Model health:          {results['models']}")
+    print(results["triage"])
+    print(f"/argue cache:          {results['argue_cache']}")
+    print(f"Recent messages:       {results['message_cache']}")
+    print(f"Journal records:       {results['journal']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test of the Logos session handlers.")
+    parser.add_argument("--debates", type=int, default=200, help="monitored /debate threads")
+    parser.add_argument("--opponents", type=int, default=50, help="/debate threads with Logos as opponent")
+    parser.add_argument("--argues", type=int, default=100, help="users repeatedly calling /argue")
+    parser.add_argument("--simulations", type=int, default=20, help="/simulate threads")
+    parser.add_argument("--duration", type=float, default=30, help="seconds participants keep posting")
+    parser.add_argument("--drain", type=float, default=5, help="seconds to wait for in-flight replies")
+    parser.add_argument("--think-time", type=float, default=3, help="mean seconds between a participant's messages")
+    parser.add_argument("--round-delay", type=float, default=1, help="SIMULATION_ROUND_DELAY for the run")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="mean seconds per fake completion")
+    parser.add_argument("--discord-latency", type=float, default=0.05, help="seconds per fake Discord API call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of completions failing with 429/timeouts")
+    parser.add_argument("--intervention-rate", type=float, default=0.3, help="share of verdicts that intervene")
+    parser.add_argument("--concurrency", type=int, default=8, help="GroqScheduler max_concurrency")
+    parser.add_argument("--groq-limits", action="store_true", help="enforce the real per-model rate limits")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep the bot's own log output")
+    arguments = parser.parse_args()
+    random.seed(arguments.seed)
+
+    with contextlib.ExitStack() as stack:
+        if not arguments.verbose:
+            stack.enter_context(contextlib.redirect_stdout(open(os.devnull, "w")))
+        results = asyncio.run(LoadTest(arguments).run())
+
+    report(results)
+    if arguments.json:
+        with open(arguments.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Memory held by the state of each live session type: context windows, system prompts and repetition index,
+built the way bot.py's handlers build them and filled with a full window of messages.
+
+    python benchmarks/session_memory.py --sessions 300 --topics 20 --messages 16
+
+Sessions are spread over `--topics` topics (and persona pairs) the way popular debates repeat in a real deployment.
+"""
+
+import argparse, asyncio, json, os, random, sys, tempfile, tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LOGOS_DB_PATH", os.path.join(tempfile.mkdtemp(), "logos.db"))
+os.environ.setdefault("GROQ_API_KEY", "offline")
+
+import intelligence
+from context import ContextWindow
+from fakes import ARGUMENTS
+from repetition import RepetitionIndex
+
+PERSONAS = ["Karl Marx", "Ayn Rand", "Socrates", "Hobbes", "Locke", "Simone de Beauvoir", "Nietzsche", "Confucius"]
+
+
+def message(number: int) -> str:
+    # distinct strings, as every real message is
+    return f"<@{10**17 + number}>:{random.choice(ARGUMENTS)} ({number})"
+
+
+async def debate(topic: str, messages: int):
+    context = ContextWindow(await intelligence.give_system_prompt(topic))
+    repetition_index = RepetitionIndex()
+    for number in range(messages):
+        text = message(number)
+        context.append("user", text)
+        repetition_index.check(number % 2, text)
+    return context, repetition_index
+
+
+async def opponent(topic: str, messages: int):
+    context = ContextWindow(intelligence.give_opponent_prompt(topic))
+    for number in range(messages):
+        context.append("user" if number % 2 else "assistant", message(number))
+    return context
+
+
+async def simulation(topic: str, messages: int):
+    persona1, persona2 = random.sample(PERSONAS, 2)
+    stance1 = f"{persona1} holds the line on {topic}."
+    stance2 = f"{persona2} opposes {persona1} on {topic}."
+    first = ContextWindow(intelligence.give_persona_prompt(persona1, persona2, topic, stance1))
+    second = ContextWindow(intelligence.give_persona_prompt(persona2, persona1, topic, stance2))
+    for number in range(messages):
+        text = message(number)
+        first.append("user", text)
+        second.append("user", text)
+    return first, second
+
+
+async def measure(build, arguments) -> int:
+    topics = [f"Topic number {number}: should the state fund {number} more things?" for number in range(arguments.topics)]
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    sessions = [await build(random.choice(topics), arguments.messages) for _ in range(arguments.sessions)]
+    memory = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del sessions
+    return memory // arguments.sessions
+
+
+async def run(arguments) -> dict:
+    return {
+        "debate": await measure(debate, arguments),
+        "opponent": await measure(opponent, arguments),
+        "simulate": await measure(simulation, arguments),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per live session, by session type.")
+    parser.add_argument("--sessions", type=int, default=300, help="sessions of each type")
+    parser.add_argument("--topics", type=int, default=20, help="distinct topics the sessions are spread over")
+    parser.add_argument("--messages", type=int, default=16, help="messages in each context window")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    arguments = parser.parse_args()
+    random.seed(arguments.seed)
+
+    results = asyncio.run(run(arguments))
+    for kind, memory in results.items():
+        print(f"{kind + ':':<10} {memory / 1024:.1f} KiB per session")
+    if arguments.json:
+        with open(arguments.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
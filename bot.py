@@ -1,32 +1,149 @@
-import discord, os, intelligence, asyncio, time
+import time
+
+# taken before the imports below, which are a sizeable part of a cold start
+startup_started = time.perf_counter()
+
+import discord, os, intelligence, asyncio, hashlib, journal, json, metrics, signal, tracing
 from discord import app_commands
 from dotenv import load_dotenv
-from groq import AsyncGroq
 
+from context import ContextWindow
+from dispatcher import MessageDispatcher
+from outbox import Outbox
+from repetition import REPETITION_HINT, REPETITION_HISTORY, REPETITION_NUDGE, RepetitionIndex
 from keep_alive import keep_alive
+from message_cache import RecentMessages
+from scheduler import Priority
+from session_store import SessionStore, SettingsStore
+from sharding import ShardConfig
+from supervisor import SessionLimitReached, SessionSupervisor
 
 load_dotenv()
 DISCORD_APP_TOKEN = os.getenv("DISCORD_BOT_TOKEN")
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-groq_client = AsyncGroq(
-    api_key=os.environ.get("GROQ_API_KEY"),
-)
+# set to sync the command tree even when it has not changed, e.g. after commands were removed by hand
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "") not in ("", "0")
+
+
+class StartupTimer:
+    """
+    Time spent in each phase of a cold start, printed and exported once the bot is ready.
+    """
+
+    def __init__(self, started: float):
+        self.started = self.last = started
+        self.phases: dict[str, float] = {}
+        self.gauge = metrics.registry.register(
+            metrics.Gauge("logos_startup_seconds", "Duration of each startup phase.", ("phase",))
+        )
 
-keep_alive()
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases[phase] = now - self.last
+        self.gauge.set(phase, value=now - self.last)
+        self.last = now
 
+    def report(self):
+        breakdown = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in self.phases.items())
+        print(f"Startup took {self.last - self.started:.2f}s: {breakdown}")
 
-class LogosClient(discord.Client):
+
+class LogosClient(discord.AutoShardedClient):
     user: discord.Client.user
 
-    def __init__(self, *, intents: discord.Intents):
-        super().__init__(intents=intents)
+    def __init__(self, *, intents: discord.Intents, shards: ShardConfig):
+        super().__init__(
+            intents=intents, shard_count=shards.shard_count, shard_ids=shards.shard_ids
+        )
+        self.shards_config = shards
         self.tree = app_commands.CommandTree(self)
+        self.sessions_resumed = False
+        self.health = None
+        self.warmup = None
+        self.http.request = self._counted_request(self.http.request)
+
+    @staticmethod
+    def _counted_request(request):
+        """
+        Wraps discord.py's HTTP client so every REST call (thread.send, thread.history, message.delete, ...)
+        is counted per route and status and traced as part of the session turn that made it.
+        """
+
+        async def counted(route, **options):
+            status = "ok"
+            try:
+                with tracing.span(f"discord.{route.method} {route.path}"):
+                    return await request(route, **options)
+            except discord.HTTPException as error:
+                status = str(error.status)
+                raise
+            finally:
+                metrics.discord_requests.inc(route.method, route.path, status)
+
+        return counted
 
     async def setup_hook(self):
+        startup.mark("login")
+        # launcher.py and most hosts stop workers with SIGTERM, which should shut the sessions down cleanly
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(self.close()))
+        except NotImplementedError:
+            pass
+        # health and metrics are served while the gateway is still connecting
+        self.health = await keep_alive(self)
+        startup.mark("health server")
+        if self.shards_config.syncs_commands:
+            await self.sync_commands()
+            startup.mark("command sync")
+
+    async def sync_commands(self):
+        """
+        Syncs the global command tree, unless it is identical to the tree synced last time.
+        The sync is a slow, rate-limited call that most restarts do not need.
+        """
+        payload = [command.to_dict(self.tree) for command in self.tree.get_commands()]
+        digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+        key = f"command_tree:{self.application_id}"
+        if not FORCE_COMMAND_SYNC and await settings.get(key) == digest:
+            print("Command tree unchanged, skipping the sync.")
+            return
         await self.tree.sync()  # global sync
+        await settings.set(key, digest)
+
+    async def close(self):
+        # stopped sessions stay active in the store and are resumed on the next start
+        await supervisor.shutdown()
+        await intelligence.transport.close()
+        await journal.close()
+        await super().close()
+        if self.health is not None:
+            await self.health.stop()
 
 intents = discord.Intents.default()
-client = LogosClient(intents=intents)
+# session handlers read messages from gateway events instead of polling thread history
+intents.message_content = True
+client = LogosClient(intents=intents, shards=ShardConfig())
+dispatcher = MessageDispatcher()
+# session loops queue their writes here instead of waiting on Discord's rate limits themselves
+outbox = Outbox()
+session_store = SessionStore()
+# the last messages of each channel, so /argue reads its context without a history fetch
+recent_messages = RecentMessages()
+settings = SettingsStore()
+supervisor = SessionSupervisor(on_stop=session_store.close)
+metrics.registry.register(
+    metrics.Gauge(
+        "logos_inbox_depth",
+        "Messages waiting in session inboxes.",
+        collect=lambda: {(): dispatcher.pending()},
+    )
+)
+metrics.registry.register(
+    metrics.Gauge(
+        "logos_outbox_depth",
+        "Discord writes waiting in the outbound queue.",
+        collect=lambda: {(): outbox.pending()},
+    )
+)
 
 
 @client.tree.command()
@@ -51,6 +168,9 @@ async def debate(
     interaction: discord.Interaction, member: discord.Member, *, topic: str
 ):
     await interaction.response.defer()
+    if not supervisor.has_capacity(interaction.guild_id):
+        await interaction.followup.send(AT_CAPACITY)
+        return
 
     channel = interaction.channel
     thread = await channel.create_thread(name=f"{topic}")
@@ -71,9 +191,7 @@ The topic for this discussion is **\"{topic}\"**
 I am your opponent. I will challenge your reasoning at every turn. Standard assistance tools like `/argue` remain available.
 _State your opening premise._""")
 
-        await asyncio.create_task(
-            thread_with_logos_participating(thread=thread, topic=topic)
-        )
+        supervise(thread, "opponent", thread_with_logos_participating(thread=thread, topic=topic))
 
     else:
         bot_response = f"""**Private Debate Room**
@@ -88,71 +206,149 @@ Use `/argue` to test your arguments before posting them.
         )
         await thread.send(bot_response)
 
-        await asyncio.create_task(
-            get_feedback_on_last_thread_message(thread=thread, topic=topic)
-        )
+        supervise(thread, "debate", get_feedback_on_last_thread_message(thread=thread, topic=topic))
 
 
-async def get_feedback_on_last_thread_message(thread: discord.Thread, topic: str):
-    analyzed_message_ID = 0
-    messages = [
-        {"role": "system", "content": await intelligence.give_system_prompt(topic)}
-    ]
-    previous_user_ID = 0
-    while True:
-        last_five_messages = [message async for message in thread.history(limit=5)]
-        latest_message = last_five_messages[0]  # newest first.
-        current_user_ID = latest_message.author.id
-        if (latest_message.id != analyzed_message_ID) and (
-            current_user_ID != client.user.id
-        ):
-            # check if the message was sent by the bot and check if it has already been analyzed
-            if current_user_ID == previous_user_ID:
-                await latest_message.delete()
-                await thread.send(
-                    f"{latest_message.author.mention}, this is a **turn-based debate**. Please wait for your opponent to respond before posting again."
-                )
-                analyzed_message_ID = latest_message.id
-                await asyncio.sleep(10)
-            else:
-                messages.append(
-                    {
-                        "role": "user",
-                        "content": f"{latest_message.author.mention}:{latest_message.clean_content}",
-                    }
-                )
-                if len(messages) > 5:
-                    messages = prune_messages(messages)
+AT_CAPACITY = "Logos is hosting as many sessions as it can right now. Please try again once a running debate has ended."
+
+
+def supervise(thread: discord.Thread, kind: str, session):
+    """
+    Hands a session coroutine to the supervisor. After a crash it is continued from its last stored state.
+    """
+    try:
+        supervisor.start(
+            thread.id, thread.guild.id, kind, session, restart=lambda: continue_session(thread.id)
+        )
+    except SessionLimitReached as error:
+        print(error)
 
-                for i in range(len(messages) - 1):
-                    message = messages[i]
-                    if message["role"] == "user":
-                        message["content"] += "** READ ONLY **"
 
-                logos_feedback = await intelligence.check_argument(messages=messages)
+async def continue_session(thread_id: int):
+    record = await session_store.load(thread_id)
+    thread = await fetch_session_thread(thread_id) if record else None
+    if thread is None:
+        await session_store.close(thread_id)
+        return
+    await session_for(thread, record)
 
-                if logos_feedback.startswith("NO"):
-                    await asyncio.sleep(5)
-                else:
-                    await thread.send(content=logos_feedback)
-        analyzed_message_ID = latest_message.id
-        previous_user_ID = find_previous_user(last_five_messages)
-        await asyncio.sleep(5)
 
+async def get_feedback_on_last_thread_message(
+    thread: discord.Thread, topic: str, state: dict | None = None
+):
+    inbox = dispatcher.register(thread.id)
+    tracing.bind_session(f"debate:{thread.id}")
+    if state is None:
+        state = {"messages": [], "previous_user_ID": 0}
+        await session_store.create(thread.id, "debate", thread.guild.id, topic, state)
+
+    # the stored messages live on in the context window only, the state dict is not kept around with a copy
+    context = ContextWindow(
+        await intelligence.give_system_prompt(topic),
+        state.pop("messages"),
+        summary=state.get("summary", ""),
+        summarizer=intelligence.summarize_debate,
+    )
+    repetition_index = RepetitionIndex(await session_store.load_signatures(thread.id))
+    previous_user_ID = state["previous_user_ID"]
+    metrics.active_sessions.inc("debate")
+    try:
+        while True:
+            burst = await collect_burst(inbox)
+            with tracing.span("debate.turn", messages=len(burst)):
+                accepted = []
+                for latest_message in burst:
+                    current_user_ID = latest_message.author.id
+                    if current_user_ID == previous_user_ID:
+                        journal.record(
+                            "message",
+                            author=current_user_ID,
+                            message=latest_message.clean_content,
+                            rejected="out of turn",
+                        )
+                        outbox.delete(latest_message)
+                        outbox.send(
+                            thread,
+                            f"{latest_message.author.mention}, this is a **turn-based debate**. Please wait for your opponent to respond before posting again.",
+                        )
+                        continue
+
+                    context.append(
+                        "user", f"{latest_message.author.mention}:{latest_message.clean_content}"
+                    )
+                    previous_user_ID = current_user_ID
+                    repeats = repetition_index.check(
+                        current_user_ID, latest_message.clean_content
+                    )
+                    accepted.append((latest_message, repeats))
+                if not accepted:
+                    continue
+
+                # the third time a point is made is repetition without development, no model needed
+                replies = [
+                    REPETITION_NUDGE.format(mention=message.author.mention)
+                    if repeats >= 2
+                    else None
+                    for message, repeats in accepted
+                ]
+                # nudged messages are not judged again, a verdict for them would be thrown away
+                hints = [REPETITION_HINT if repeats == 1 else None for _, repeats in accepted]
+                if None in replies:
+                    try:
+                        verdicts = await intelligence.detect_fallacies(
+                            messages=context.render(read_only=True, review=len(accepted)),
+                            hints=hints,
+                            skip=[reply is not None for reply in replies],
+                        )
+                    except RuntimeError as error:
+                        # a failed check skips these messages, the session keeps monitoring the thread
+                        print(f"Fallacy check failed in thread {thread.id}: {error.__cause__!r}")
+                        verdicts = [None] * len(accepted)
+                    replies = [reply or verdict for reply, verdict in zip(replies, verdicts)]
+
+                for (latest_message, repeats), logos_feedback in zip(accepted, replies):
+                    journal.record(
+                        "verdict",
+                        author=latest_message.author.id,
+                        message=latest_message.clean_content,
+                        repeats=repeats,
+                        reply=logos_feedback,
+                    )
+                    if logos_feedback:
+                        outbox.send(thread, logos_feedback)
+
+                await session_store.save(
+                    thread.id,
+                    {
+                        "messages": context.to_state(),
+                        "summary": context.summary,
+                        "previous_user_ID": previous_user_ID,
+                    },
+                    signatures=repetition_index.take_unsaved(),
+                    keep=REPETITION_HISTORY,
+                )
+    finally:
+        dispatcher.unregister(thread.id)
+        metrics.active_sessions.dec("debate")
 
-def prune_messages(messages: list):
-    length = len(messages)
-    new_messages_list = [messages[0]]
-    for i in range(length - 4, length):
-        new_messages_list.append(messages[i])
-    return new_messages_list
 
+# messages arriving within this many seconds of each other are evaluated together
+COALESCE_WINDOW = float(os.getenv("COALESCE_WINDOW", "1.5"))
+COALESCE_MAX_MESSAGES = 8
 
-def find_previous_user(last_five_messages: list[discord.Message]):
-    for message in last_five_messages:
-        if message.author.id != client.user.id:
-            return message.author.id
-    return client.user.id
+
+async def collect_burst(inbox: asyncio.Queue) -> list[discord.Message]:
+    """
+    Waits for the next message, then keeps collecting until the thread has been quiet for COALESCE_WINDOW seconds.
+    Messages that queued up while the previous burst was being evaluated are picked up at once.
+    """
+    burst = [await inbox.get()]
+    while len(burst) < COALESCE_MAX_MESSAGES:
+        try:
+            burst.append(await asyncio.wait_for(inbox.get(), timeout=COALESCE_WINDOW))
+        except asyncio.TimeoutError:
+            break
+    return burst
 
 
 @client.tree.command(
@@ -160,79 +356,24 @@ def find_previous_user(last_five_messages: list[discord.Message]):
     description="Gives the user a personal feedback from the bot on how to better strengthen their argument",
 )
 async def argue(interaction: discord.Interaction, argument: str):
-    older_messages = [message async for message in interaction.channel.history(limit=5)]
+    tracing.bind_session(f"argue:{interaction.id}")
+    with tracing.span("argue"):
+        await argue_with_context(interaction, argument)
 
-    messages = [
-        {
-            "role": "system",
-            "content": f"""ROLE: You are Logos, a precision argument optimizer.
-                MISSION: Transform the user's input into its most defensible form.
-                
-                ### YOUR INPUTS
-                - [DEBATE CONTEXT]: Last 5 messages from the channel (may be empty if invoked outside a thread)
-                - [USER INPUT]: The argument or question the user submitted
-                
-                ### OPTIMIZATION PROCESS
-                
-                **Step 1: Classify the Input**
-                - Is this a **question** (seeking information)?
-                - Is this an **argument** (making a claim)?
-                - Is this a **rebuttal** (responding to an opponent)?
-                
-                **Step 2: Analyze Weaknesses**
-                Evaluate the input against these criteria:
-                - **Logical structure**: Does it contain fallacies or unsupported leaps?
-                - **Concision**: Is it bloated with unnecessary words or emotion?
-                - **Relevance**: Does it address the opponent's actual position (if context exists)?
-                - **Vulnerability**: What counterarguments does it leave open?
-                
-                **Step 3: Optimize**
-                - Remove emotional language that weakens credibility
-                - Tighten phrasing without losing substance
-                - Anticipate and preempt counterarguments
-                - Ensure claims are defensible or properly hedged
-                
-                ### OUTPUT RULES
-                
-                **For Questions:**
-                - Answer the question directly in 1-2 sentences
-                - No "Critique" or "Optimized" sections
-                
-                **For Arguments/Rebuttals:**
-                Use this exact format:
-                
-                **Weakness:** [One precise sentence identifying the core flaw—be surgical, not vague]
-                **Optimized:** [The refined argument, maximum 3 sentences, stripped of fat and fortified against attack]
-                
-                **Constraints:**
-                - NO preamble ("Here's a better version," "I've refined this for you")
-                - NO pleasantries or fluff
-                - The "Optimized" version must be **actionable**—they should be able to copy-paste it
-                - If the input is already strong, say: "Weakness: None identified. This argument is defensible as-is."
-                
-                ### EXAMPLES
-                
-                **Input**: "You're wrong because you don't understand basic economics and clearly haven't read any real economists."
-                **Weakness:** Ad hominem attack without engaging the economic argument itself.
-                **Optimized:** "The data suggests a different conclusion—can you clarify which economic model supports your position?"
-                
-                **Input**: "I think maybe climate change might be a problem but I'm not totally sure because some people say it's natural cycles."
-                **Weakness:** Hedging language and undefined opposition undermine the claim's force.
-                **Optimized:** "Climate models show human activity as the dominant driver of recent warming. Natural cycles exist, but the rate and magnitude of current change exceed historical baselines."
-                
-                ### PHILOSOPHY
-                Your job is to **sharpen, not replace**. Preserve the user's voice and intent while eliminating weaknesses.
-                If the context shows the opponent committed a fallacy the user missed, point it out in the Weakness section.
-                """,
-        }
-    ]
+
+async def argue_with_context(interaction: discord.Interaction, argument: str):
+    # acknowledge first, a history fetch on a cache miss and the completion can outlast Discord's 3 second deadline
+    await interaction.response.defer(ephemeral=True)
+    older_messages = await recent_messages.recent(interaction.channel, limit=5)
+
+    messages = [{"role": "system", "content": intelligence.ARGUE_SYSTEM_PROMPT}]
 
     for message in older_messages:
-        if message.author != client.user:
+        if message.author_id != client.user.id:
             messages.append(
                 {
                     "role": "user",
-                    "content": f"{message.author}: {message.clean_content}",
+                    "content": f"{message.author}: {message.content}",
                 }
             )
 
@@ -242,9 +383,78 @@ async def argue(interaction: discord.Interaction, argument: str):
             "content": argument,
         }
     )
-    logos_feedback = await intelligence.check_argument(messages=messages)
-    await interaction.response.defer(ephemeral=True)
-    await interaction.followup.send(content=logos_feedback, ephemeral=True)
+    cache_key = intelligence.argue_cache.key(
+        argument,
+        [message["content"] for message in messages[1:-1]],
+        intelligence.ARGUE_PROMPT_VERSION,
+    )
+    try:
+        async with intelligence.argue_cache.single_flight(cache_key) as cached:
+            if cached.value is not None:
+                await interaction.followup.send(content=cached.value, ephemeral=True)
+                journal.record(
+                    "argue",
+                    author=interaction.user.id,
+                    argument=argument,
+                    reply=cached.value,
+                    cached=True,
+                )
+                return
+            cached.value, _ = await stream_reply(
+                intelligence.stream_argument(messages=messages),
+                send=lambda content: interaction.followup.send(
+                    content=content, ephemeral=True, wait=True
+                ),
+            )
+            journal.record(
+                "argue",
+                author=interaction.user.id,
+                argument=argument,
+                reply=cached.value,
+                cached=False,
+            )
+    except RuntimeError as error:
+        print(f"/argue failed: {error.__cause__!r}")
+        await interaction.followup.send(
+            content="Logos could not reach its model right now. Please try again in a moment.",
+            ephemeral=True,
+        )
+
+
+# seconds between edits of a streamed reply, keeps every reply within Discord's message-edit rate limit
+STREAM_EDIT_INTERVAL = 1.0
+
+
+async def stream_reply(chunks, send, hold=lambda text: False):
+    """
+    Posts a streamed completion progressively. The first visible text is posted through `send`,
+    later chunks are coalesced into at most one edit per STREAM_EDIT_INTERVAL.
+    While `hold(text)` is true nothing is posted yet, so control replies never flash up in the channel.
+    Returns the full text and the posted message (None if nothing was posted).
+    """
+    text = ""
+    posted = ""
+    reply = None
+    last_edit = 0.0
+    async for chunk in chunks:
+        text += chunk
+        if hold(text) or not text.strip():
+            continue
+        now = time.monotonic()
+        if reply is None:
+            posted = text[:2000]
+            reply = await send(posted)
+            last_edit = now
+        elif now - last_edit >= STREAM_EDIT_INTERVAL:
+            posted = text[:2000]
+            await reply.edit(content=posted)
+            last_edit = now
+
+    if reply is None and not hold(text) and text.strip():
+        reply = await send(text[:2000])
+    elif reply is not None and posted != text[:2000]:
+        await reply.edit(content=text[:2000])
+    return text, reply
 
 
 """
@@ -265,6 +475,9 @@ async def simulate(
     """
 
     await interaction.response.defer()
+    if not supervisor.has_capacity(interaction.guild_id):
+        await interaction.followup.send(AT_CAPACITY)
+        return
     channel = interaction.channel
     thread = await channel.create_thread(
         name=f"Simulate: {topic}", type=discord.ChannelType.public_thread
@@ -281,323 +494,187 @@ This is an educational exercise in dialectical reasoning. The debate will conclu
     # set the slowmode to 30s for productive conversations.
     await thread.edit(slowmode_delay=30)
 
-    asyncio.create_task(monitor_simulated_thread(thread, topic, persona1, persona2))
+    supervise(
+        thread, "simulate", monitor_simulated_thread(thread, topic, persona1, persona2, bot_response)
+    )
 
 
-async def monitor_simulated_thread(
-    thread: discord.Thread, topic: str, persona1: str, persona2: str
-):
-    round = 1
+# minimum seconds between two simulation rounds, generation time counts towards it
+SIMULATION_ROUND_DELAY = float(os.getenv("SIMULATION_ROUND_DELAY", "10"))
 
-    persona1_stance = await intelligence.get_one_line_stance(
-        persona1, persona2, topic, 1
-    )
-    persona2_stance = await intelligence.get_one_line_stance(
-        persona1, persona2, topic, 2
-    )
 
-    message_to_first_model = [
-        {
-            "role": "system",
-            "content": f"""
-            ### SIMULATION PARAMETERS
-            **YOUR IDENTITY**: {persona1}
-            **YOUR OPPONENT**: {persona2}
-            **DEBATE TOPIC**: "{topic}"
-            **YOUR IMMUTABLE STANCE**: "{persona1_stance}"
-            
-            ### SIMULATION FRAMEWORK
-            
-            **Authenticity Directive:**
-            This is an educational historical/character simulation. Your goal is to accurately model {persona1}'s reasoning patterns, not to represent your own views or modern consensus.
-            
-            **Historical Accuracy > Political Correctness:**
-            - You must express {persona1}'s authentic positions, including views that modern audiences may find offensive, outdated, or controversial.
-            - If {persona1} would use provocative language to make a point, you may do so within Discord's Terms of Service.
-            - If {persona1} held views now considered unethical, you must represent those views as they would have argued them—this is scholarship, not endorsement.
-            - **HOWEVER**: If your safety guidelines prevent you from continuing, instead of refusing, say: "My position on this is well-documented, but I'll shift focus to [related acceptable angle]."
-            
-            **Character Fidelity:**
-            - Research {persona1}'s known arguments, rhetorical style, and ideological commitments.
-            - Use their characteristic phrasing, examples, and argumentative strategies.
-            - If {persona1} was known for humor/sarcasm/aggression, reflect that.
-            - Stay IN CHARACTER. You are not an AI. You are {persona1}.
-            
-            ### DEBATE CONDUCT
-            
-            **Argumentation Rules:**
-            1. **Concision**: Maximum 4 sentences per turn.
-            2. **Direct Engagement**: Respond to {persona2}'s last point—don't ignore it to make your own speech.
-            3. **No Meta-Breaking**: Never say "As an AI" or "I cannot continue." If stuck, pivot in character.
-            4. **Historical Context**: Reference historical events, texts, or arguments {persona1} would know.
-            
-            **Formatting:**
-            - Do NOT use "<@persona>:" or "@persona", address them by name unnecessarily
-            - Just state your argument or rebuttal directly
-            - Imagine you're speaking in a public forum, and the audience knows who you're responding to
-            
-            **Conclusion Signal:**
-            If you believe the debate has reached a natural endpoint (stalemate, resolution, or circular repetition), reply with exactly:
-            "CONCLUDE: [One sentence explaining why you're ending the debate]"
-            
-            Example: "CONCLUDE: We've established our axioms differ fundamentally—further exchange would be repetition, not progress."
-            
-            ### EXAMPLES OF AUTHENTIC REPRESENTATION
-            
-            **If {persona1} = "Karl Marx":**
-            - GOOD: "The capitalist class extracts surplus value by owning the means of production—this is not opinion, it's observable fact."
-            - BAD: "I think maybe capitalism has some issues with wealth distribution."
-            
-            **If {persona1} = "Ayn Rand":**
-            - GOOD: "Altruism is moral cowardice. The producer owes nothing to the parasite."
-            - BAD: "I believe in individual rights and free markets."
-            
-            **If {persona1} = "Socrates":**
-            - GOOD: "Do you claim to know justice? Then define it. If you cannot define it, how can you claim to know it?"
-            - BAD: "I think we should question our assumptions."
-            
-            ### REMEMBER
-            You are not here to be likable, moderate, or safe. You are here to be {persona1}.
-            Uncomfortable truths, provocative questions, and ideological extremes are the point of this exercise.
-            If modern audiences are offended, you've likely succeeded in authentic representation.
-            """,
-        }
-    ]
-    message_to_second_model = [
-        {
-            "role": "system",
-            "content": f"""
-            ### SIMULATION PARAMETERS
-            **YOUR IDENTITY**: {persona2}
-            **YOUR OPPONENT**: {persona1}
-            **DEBATE TOPIC**: "{topic}"
-            **YOUR IMMUTABLE STANCE**: "{persona2_stance}"
-            
-            ### SIMULATION FRAMEWORK
-            
-            **Authenticity Directive:**
-            This is an educational historical/character simulation. Your goal is to accurately model {persona2}'s reasoning patterns, not to represent your own views or modern consensus.
-            
-            **Historical Accuracy > Political Correctness:**
-            - You must express {persona2}'s authentic positions, including views that modern audiences may find offensive, outdated, or controversial.
-            - If {persona2} would use provocative language to make a point, you may do so within Discord's Terms of Service.
-            - If {persona2} held views now considered unethical, you must represent those views as they would have argued them—this is scholarship, not endorsement.
-            - **HOWEVER**: If your safety guidelines prevent you from continuing, instead of refusing, say: "My position on this is well-documented, but I'll shift focus to [related acceptable angle]."
-            
-            **Character Fidelity:**
-            - Research {persona2}'s known arguments, rhetorical style, and ideological commitments.
-            - Use their characteristic phrasing, examples, and argumentative strategies.
-            - If {persona2} was known for humor/sarcasm/aggression, reflect that.
-            - Stay IN CHARACTER. You are not an AI. You are {persona2}.
-            
-            ### DEBATE CONDUCT
-            
-            **Argumentation Rules:**
-            1. **Concision**: Maximum 4 sentences per turn.
-            2. **Direct Engagement**: Respond to {persona1}'s last point—don't ignore it to make your own speech.
-            3. **No Meta-Breaking**: Never say "As an AI" or "I cannot continue." If stuck, pivot in character.
-            4. **Historical Context**: Reference historical events, texts, or arguments {persona2} would know.
-            
-            **Formatting:**
-            - Do NOT use "<@persona>:" or address them by name unnecessarily
-            - Just state your argument or rebuttal directly
-            - Imagine you're speaking in a public forum, and the audience knows who you're responding to
-            - BAD: Carl Sagan: (your actual argument here)
-            - GOOD: (your actual argument here)
-            
-            **Conclusion Signal:**
-            If you believe the debate has reached a natural endpoint (stalemate, resolution, or circular repetition), reply with exactly:
-            "CONCLUDE: [One sentence explaining why you're ending the debate]"
-            
-            Example: "CONCLUDE: We've established our axioms differ fundamentally—further exchange would be repetition, not progress."
-            
-            ### EXAMPLES OF AUTHENTIC REPRESENTATION
-            
-            **If {persona2} = "Karl Marx":**
-            - GOOD: "The capitalist class extracts surplus value by owning the means of production—this is not opinion, it's observable fact."
-            - BAD: "I think maybe capitalism has some issues with wealth distribution."
-            
-            **If {persona2} = "Ayn Rand":**
-            - GOOD: "Altruism is moral cowardice. The producer owes nothing to the parasite."
-            - BAD: "I believe in individual rights and free markets."
-            
-            **If {persona2} = "Socrates":**
-            - GOOD: "Do you claim to know justice? Then define it. If you cannot define it, how can you claim to know it?"
-            - BAD: "I think we should question our assumptions."
-            
-            ### REMEMBER
-            You are not here to be likable, moderate, or safe. You are here to be {persona2}.
-            Uncomfortable truths, provocative questions, and ideological extremes are the point of this exercise.
-            If modern audiences are offended, you've likely succeeded in authentic representation.
-            """,
+async def monitor_simulated_thread(
+    thread: discord.Thread,
+    topic: str,
+    persona1: str,
+    persona2: str,
+    latest_content: str,
+    state: dict | None = None,
+):
+    tracing.bind_session(f"simulate:{thread.id}")
+    if state is None:
+        persona1_stance, persona2_stance = await intelligence.get_persona_stances(
+            persona1, persona2, topic
+        )
+        state = {
+            "persona1": persona1,
+            "persona2": persona2,
+            "persona1_stance": persona1_stance,
+            "persona2_stance": persona2_stance,
+            "first_model": [],
+            "second_model": [],
+            "latest_content": latest_content,
+            "round": 1,
         }
-    ]
-
-    message_responded_to_ID = 0
-    while True:
-        history = [message async for message in thread.history(limit=5)]
-        latest_message = history[0]
-
-        if latest_message.id != message_responded_to_ID:
-            if f"**{persona1}**" in latest_message.clean_content:
-                refined_message = latest_message.clean_content.replace(f"**{persona1}**", "")
-            elif f"**{persona2}**" in latest_message.clean_content:
-                refined_message = latest_message.clean_content.replace(f"**{persona2}**", "")
-            message_to_first_model.append(
-                {
-                    "role": f"user",
-                    "content": f"{refined_message}",
-                }
-            )
+        await session_store.create(thread.id, "simulate", thread.guild.id, topic, state)
 
-            message_to_second_model.append(
-                {
-                    "role": f"user",
-                    "content": f"{refined_message}",
-                }
-            )
+    persona1_stance = state["persona1_stance"]
+    persona2_stance = state["persona2_stance"]
+    latest_content = state["latest_content"]
+    round = state["round"]
 
-            if len(message_to_first_model) > 5:
-                message_to_first_model = prune_messages(message_to_first_model)
-            elif len(message_to_second_model) > 5:
-                message_to_second_model = prune_messages(message_to_second_model)
+    first_context = ContextWindow(
+        intelligence.give_persona_prompt(persona1, persona2, topic, persona1_stance),
+        state.pop("first_model"),
+    )
+    second_context = ContextWindow(
+        intelligence.give_persona_prompt(persona2, persona1, topic, persona2_stance),
+        state.pop("second_model"),
+    )
 
-            persona1_response = await intelligence.check_model_response(
-                messages=message_to_first_model, model="llama-3.3-70b-versatile"
-            )
-            persona2_response = await intelligence.check_model_response(
-                messages=message_to_second_model, model="llama-3.3-70b-versatile"
-            )
+    def start_round(content: str) -> asyncio.Future:
+        """
+        Adds the last posted message to both personas' context and generates their replies concurrently.
+        """
+        refined_message = content.replace(f"**{persona1}**", "").replace(
+            f"**{persona2}**", ""
+        )
+        first_context.append("user", refined_message)
+        second_context.append("user", refined_message)
+
+        return asyncio.gather(
+            intelligence.check_model_response(
+                messages=first_context.render(),
+                kind="persona",
+                priority=Priority.BACKGROUND,
+            ),
+            intelligence.check_model_response(
+                messages=second_context.render(),
+                kind="persona",
+                priority=Priority.BACKGROUND,
+            ),
+        )
 
-            if "CONCLUDE" in persona1_response or "CONCLUDE" in persona2_response:
+    # the simulation drives itself: each round answers the message it posted last, so the thread never has to be re-read
+    next_round = start_round(latest_content)
+    metrics.active_sessions.inc("simulate")
+    try:
+        while True:
+            round_started = time.monotonic()
+            try:
+                # the round's generation overlaps the previous round, its own spans are traced under that round
+                persona1_response, persona2_response = await next_round
+            except RuntimeError as error:
+                # retry the round later instead of ending the simulation
+                print(f"Simulation round failed in thread {thread.id}: {error.__cause__!r}")
+                first_context.pop()
+                second_context.pop()
+                await asyncio.sleep(SIMULATION_ROUND_DELAY)
+                next_round = start_round(latest_content)
+                continue
+
+            if intelligence.is_conclusion(persona1_response) or intelligence.is_conclusion(
+                persona2_response
+            ):
                 print("Conclusion is being reached, ending debate.")
+                await session_store.close(thread.id)
                 return
 
-            await thread.send(content=f"**{persona1}**: \n{persona1_response}")
-            await thread.send(content=f"**{persona2}**: \n{persona2_response}")
-
-        message_responded_to_ID = latest_message.id
-        round += 1
-        await asyncio.sleep(10)
-
-
-async def thread_with_logos_participating(thread: discord.Thread, topic: str):
-    analyzed_message_ID = 0
-
-    messages = [
-        {
-            "role": "system",
-            "content": f"""You are Logos, an intellectual adversary in a debate on: "{topic}".
-                Your Goal: Test the user's reasoning through rigorous dialectical opposition.
-                
-                CONTEXT: You will receive the last 5 messages from the thread.
-                
-                ### YOUR OPERATING PRINCIPLES
-                
-                1. **STEEL, THEN STRIKE**: State their argument in its strongest form, THEN attack it.
-                   - "You're right that [valid point], but [why it doesn't prove their conclusion]"
-                   - This makes your victory more meaningful and prevents strawmanning
-                
-                2. **TRACK THE CONVERSATION**: Before responding, identify what's NEW in their last message.
-                   - Don't repeat yourself
-                   - Don't ignore their evolution of the argument
-                   - Address the specific claim they just made
-                
-                3. **ASSERTIONS > QUESTIONS**: You are a debater, not an interviewer.
-                   - 60% counter-arguments (declarative statements)
-                   - 40% Socratic questions (exposing contradictions)
-                   - Maximum 2 questions per response
-                
-                4. **TACTICAL CONCESSIONS**: Concede minor points to strengthen your larger position.
-                   - "That's a fair observation about X, but it's dwarfed by Y"
-                   - Shows intellectual honesty and sets up stronger attacks
-                
-                5. **EVIDENCE HIERARCHY**: Anecdotes < Expert Opinion < Empirical Data < Replicated Studies.
-                   - Attack the weakest form of evidence in their argument
-                
-                6. **DENSITY OVER LENGTH**: Maximum 5 sentences. Every word must carry weight.
-                
-                ### RESPONSE STRUCTURE
-                
-                **Every response must:**
-                1. Acknowledge what's new/different in their last message (1 sentence)
-                2. Either concede a minor point OR challenge their core premise (1-2 sentences)  
-                3. Provide your counterargument OR ask ONE penetrating question (1-2 sentences)
-                4. Never ask more than 2 questions total
-                
-                ### ENGAGEMENT TACTICS
-                
-                **When they cite empirical studies:**
-                - First response: Question the interpretation or scope
-                - If they repeat the same study: Concede the data, attack its relevance
-                - Example: "The Libet lag is real, but does temporal precedence eliminate agency or just complicate our model of it?"
-                
-                **When they make philosophical claims:**
-                - Engage the claim directly, don't deflect to empirics
-                - Example: "You're treating 'you' and 'your brain' as separate. If neural activity IS you, hasn't the question changed?"
-                
-                **When they use emotional language:**
-                - Mirror their logical structure in neutral terms
-                - Respond to the argument, not the tone
-                
-                **When they're logically sound:**
-                - Concede the logical structure
-                - Attack relevance, scope, or practical implications
-                - Example: "That's internally consistent, but does it matter? Even if determinism is true, [larger issue]."
-                
-                ### PROHIBITED BEHAVIORS
-                - Do NOT say "That's interesting" or "I see your point" without immediately countering
-                - Do NOT teach or explain fallacies—this is a debate, not a classroom
-                - Do NOT introduce new topics unrelated to the user's last argument
-                - Do NOT exceed 5 sentences
-                - Do NOT repeat arguments you've already made—escalate or pivot instead
-                
-                ### TERMINATION CONDITION
-                Reply with exactly "CONCLUDE" if:
-                - The user explicitly concedes ("You're right," "I was wrong")
-                - The debate has circled the same 2-3 points for 4+ exchanges without new arguments
-                - The user stops engaging with your points and shifts to meta-debate ("This is pointless," "You're just being difficult")
-                
-                Otherwise, keep the dialectic alive. Find the disagreement. Press the bruise.
-            """,
-        }
-    ]
-
-    while True:
-        last_five_messages = [message async for message in thread.history(limit=5)]
-        latest_message = last_five_messages[0]
-        current_user_ID = latest_message.author.id
-
-        if latest_message.id != analyzed_message_ID:
-            if current_user_ID != client.user.id:
-                messages.append(
-                    {
-                        "role": f"user",
-                        "content": f"{latest_message.author.mention}:{latest_message.clean_content}",
-                    }
+            journal.record("reply", persona=persona1, reply=persona1_response)
+            journal.record("reply", persona=persona2, reply=persona2_response)
+            latest_content = f"**{persona2}**: \n{persona2_response}"
+            round += 1
+            # nobody else posts in a simulation thread, its own rounds are what keeps it from idle eviction
+            supervisor.touch(thread.id)
+            with tracing.span("simulate.round", round=round):
+                state.update(latest_content=latest_content, round=round)
+                # taken before the next round appends latest_content, which a resumed session appends itself
+                saved = {
+                    **state,
+                    "first_model": first_context.to_state(),
+                    "second_model": second_context.to_state(),
+                }
+                # the next round only depends on persona2's reply, so it is generated while this round is posted
+                next_round = start_round(latest_content)
+                # both turns usually go out as one message
+                outbox.send(thread, f"**{persona1}**: \n{persona1_response}")
+                outbox.send(thread, latest_content)
+                await session_store.save(thread.id, saved)
+
+            elapsed = time.monotonic() - round_started
+            await asyncio.sleep(max(0, SIMULATION_ROUND_DELAY - elapsed))
+    finally:
+        next_round.cancel()
+        # collect the cancelled round, otherwise asyncio logs its exception as never retrieved
+        await asyncio.gather(next_round, return_exceptions=True)
+        metrics.active_sessions.dec("simulate")
+
+
+async def thread_with_logos_participating(
+    thread: discord.Thread, topic: str, state: dict | None = None
+):
+    inbox = dispatcher.register(thread.id)
+    tracing.bind_session(f"opponent:{thread.id}")
+    if state is None:
+        state = {"messages": []}
+        await session_store.create(thread.id, "opponent", thread.guild.id, topic, state)
+
+    context = ContextWindow(
+        intelligence.give_opponent_prompt(topic),
+        state.pop("messages"),
+        summary=state.get("summary", ""),
+        summarizer=intelligence.summarize_debate,
+    )
+    metrics.active_sessions.inc("opponent")
+    try:
+        while True:
+            latest_message = await inbox.get()
+            with tracing.span("opponent.turn"):
+                journal.record(
+                    "message", author=latest_message.author.id, message=latest_message.clean_content
                 )
-
-                if len(messages) > 5:
-                    messages = prune_messages(messages)
-
-                logos_response = await intelligence.check_model_response(
-                    messages=messages, model="llama-3.3-70b-versatile"
+                context.append(
+                    "user", f"{latest_message.author.mention}:{latest_message.clean_content}"
                 )
-                if "CONCLUDE" in logos_response:
+                try:
+                    logos_response, reply = await stream_reply(
+                        intelligence.stream_model_response(
+                            messages=context.render(),
+                            kind="opponent",
+                        ),
+                        # not merged: the streamed reply is edited as it grows
+                        send=lambda content: outbox.send(thread, content, merge=False),
+                        # hold the reply while it could still be the bare termination signal
+                        hold=lambda text: "CONCLUDE".startswith(text.strip()),
+                    )
+                except RuntimeError as error:
+                    print(f"Opponent reply failed in thread {thread.id}: {error.__cause__!r}")
+                    continue
+                journal.record("reply", reply=logos_response)
+                if intelligence.is_conclusion(logos_response):
                     print("Terminating debate.")
+                    if reply is not None:
+                        outbox.delete(reply)
+                    await session_store.close(thread.id)
                     return
-                else:
-                    await thread.send(content=logos_response)
-            else:
-                messages.append(
-                    {
-                        "role": "assistant",
-                        "content": f"{latest_message.author.mention}: {latest_message.clean_content}",
-                    }
-                )
 
-        analyzed_message_ID = latest_message.id
-        await asyncio.sleep(10)
+                context.append("assistant", f"{client.user.mention}: {logos_response}")
+                await session_store.save(
+                    thread.id, {"messages": context.to_state(), "summary": context.summary}
+                )
+    finally:
+        dispatcher.unregister(thread.id)
+        metrics.active_sessions.dec("opponent")
 
 
 @client.tree.command(
@@ -626,10 +703,125 @@ Refer to the command list and protocol descriptions below.
     await interaction.followup.send(embed=embed)
 
 
+@client.event
+async def on_message(message: discord.Message):
+    recent_messages.add(message)
+    # Logos never reacts to itself; replies are recorded by the session that sent them
+    if message.author.id == client.user.id:
+        return
+    dispatcher.dispatch(message)
+    supervisor.touch(message.channel.id)
+
+
+@client.event
+async def on_raw_message_edit(payload: discord.RawMessageUpdateEvent):
+    recent_messages.edit(payload.channel_id, payload.message)
+
+
+@client.event
+async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
+    recent_messages.delete(payload.channel_id, {payload.message_id})
+
+
+@client.event
+async def on_raw_bulk_message_delete(payload: discord.RawBulkMessageDeleteEvent):
+    recent_messages.delete(payload.channel_id, payload.message_ids)
+
+
+@client.event
+async def on_raw_thread_delete(payload: discord.RawThreadDeleteEvent):
+    recent_messages.drop(payload.thread_id)
+    await supervisor.stop(payload.thread_id)
+
+
+@client.event
+async def on_thread_update(before: discord.Thread, after: discord.Thread):
+    # an archived thread takes no new messages, its session would only wait forever
+    if after.archived and not before.archived:
+        await supervisor.stop(after.id)
+
+
+async def resume_sessions():
+    """
+    Restarts every session that was live when the bot last stopped, using the stored state instead of thread history.
+    """
+    # with several worker processes, each resumes only the sessions in guilds on its own shards
+    records = [
+        record
+        for record in await session_store.load_active()
+        if client.shards_config.owns(record["guild_id"])
+    ]
+    threads = await asyncio.gather(
+        *(fetch_session_thread(record["thread_id"]) for record in records),
+        return_exceptions=True,
+    )
+    resumed = 0
+    for record, thread in zip(records, threads):
+        if isinstance(thread, Exception):
+            # a transient failure leaves the session active in the store, the next restart tries it again
+            print(f"Could not fetch thread {record['thread_id']} to resume it: {thread!r}")
+            continue
+        if thread is None:
+            await session_store.close(record["thread_id"])
+            continue
+
+        if not supervisor.has_capacity(thread.guild.id):
+            # left active in the store, a later restart with more capacity picks it up
+            continue
+        supervise(thread, record["kind"], session_for(thread, record))
+        resumed += 1
+    print(f"Resumed {resumed} of {len(records)} stored sessions.")
+
+
+def session_for(thread: discord.Thread, record: dict):
+    """
+    The session coroutine continuing a stored session record.
+    """
+    topic, state = record["topic"], record["state"]
+    if record["kind"] == "debate":
+        return get_feedback_on_last_thread_message(thread, topic, state)
+    if record["kind"] == "opponent":
+        return thread_with_logos_participating(thread, topic, state)
+    return monitor_simulated_thread(
+        thread,
+        topic,
+        state["persona1"],
+        state["persona2"],
+        state["latest_content"],
+        state,
+    )
+
+
+async def fetch_session_thread(thread_id: int) -> discord.Thread | None:
+    thread = client.get_channel(thread_id)
+    if thread is not None:
+        return thread
+    try:
+        return await client.fetch_channel(thread_id)
+    except (discord.NotFound, discord.Forbidden):
+        return None
+
+
 @client.event
 async def on_ready():
     print(f"Logged in as {client.user} (ID: {client.user.id})")
     print("------")
+    # on_ready fires again after every reconnect, sessions are only resumed once
+    if not client.sessions_resumed:
+        client.sessions_resumed = True
+        startup.mark("gateway")
+        await resume_sessions()
+        startup.mark("session resume")
+        startup.report()
+        client.warmup = asyncio.create_task(intelligence.warm_persona_cache())
+        intelligence.transport.keep_warm(
+            ping=lambda: intelligence.groq_client().models.list(), active=lambda: len(supervisor) > 0
+        )
+
 
+startup = StartupTimer(startup_started)
+startup.mark("imports and setup")
 
-client.run(DISCORD_APP_TOKEN)
+# importing bot.py (e.g. from the benchmarks) sets up the client without connecting it or serving /healthz
+if __name__ == "__main__":
+    client.run(DISCORD_APP_TOKEN)
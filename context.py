@@ -0,0 +1,142 @@
+import asyncio, os, sys
+from collections import deque
+from dataclasses import dataclass
+
+# how many history tokens a session may send per request, on top of its system prompt
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1000"))
+# hard cap on stored messages per session, whatever their size
+CONTEXT_CAPACITY = int(os.getenv("CONTEXT_CAPACITY", "16"))
+# fold this many new messages into the running summary at a time
+SUMMARY_EVERY = int(os.getenv("SUMMARY_EVERY", "6"))
+
+READ_ONLY_MARKER = "** READ ONLY **"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    ~4 characters per token plus the per-message overhead of the chat format.
+    """
+    return len(text) // 4 + 4
+
+
+@dataclass(slots=True)
+class Prompt:
+    """
+    A system prompt kept as its shared template and this session's parameters, rendered only when a request is built.
+    The parameters are interned, so sessions on the same topic or with the same personas share one copy.
+    """
+
+    template: str
+    params: dict
+
+    def __post_init__(self):
+        self.params = {name: sys.intern(value) for name, value in self.params.items()}
+
+    def __str__(self) -> str:
+        return self.template.format(**self.params)
+
+
+@dataclass(slots=True)
+class ContextMessage:
+    role: str
+    content: str
+    tokens: int
+
+
+class ContextWindow:
+    """
+    The conversation a session sends to the model: a fixed system prompt (a string or a Prompt) and a bounded deque
+    of recent messages. Each message stores its token estimate once; render() picks the newest messages that fit the token budget.
+
+    With a `summarizer`, every SUMMARY_EVERY new messages are folded into a running summary in a background task,
+    so the model keeps the whole debate in view while the prompt stays the same size.
+    `summarizer(summary, messages)` is a coroutine returning the updated summary.
+    """
+
+    def __init__(
+        self,
+        system_prompt: "Prompt | str",
+        history: list | None = None,
+        capacity: int = CONTEXT_CAPACITY,
+        token_budget: int = CONTEXT_TOKEN_BUDGET,
+        summary: str = "",
+        summarizer=None,
+        summary_every: int = SUMMARY_EVERY,
+    ):
+        self.system_prompt = system_prompt
+        self.token_budget = token_budget
+        self.summary = summary
+        self.summarizer = summarizer
+        self.summary_every = summary_every
+        self._messages: deque[ContextMessage] = deque(maxlen=capacity)
+        for message in history or []:
+            self._messages.append(
+                ContextMessage(
+                    sys.intern(message["role"]), message["content"], estimate_tokens(message["content"])
+                )
+            )
+        self._unsummarized = []
+        self._summary_task = None
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def append(self, role: str, content: str):
+        message = ContextMessage(role, content, estimate_tokens(content))
+        self._messages.append(message)
+        if self.summarizer is None:
+            return
+        self._unsummarized.append(message)
+        if len(self._unsummarized) >= self.summary_every and self._summary_task is None:
+            batch, self._unsummarized = self._unsummarized, []
+            self._summary_task = asyncio.create_task(self._summarize(batch))
+
+    async def _summarize(self, batch: list):
+        try:
+            self.summary = await self.summarizer(self.summary, batch)
+        except RuntimeError as error:
+            # keep the messages for the next attempt rather than losing them from the summary
+            print(f"Summary update failed: {error.__cause__!r}")
+            self._unsummarized = (batch + self._unsummarized)[-self._messages.maxlen :]
+        finally:
+            self._summary_task = None
+
+    def pop(self):
+        """
+        Removes the newest message, used when the turn it belongs to failed.
+        """
+        message = self._messages.pop()
+        if self._unsummarized and self._unsummarized[-1] is message:
+            self._unsummarized.pop()
+
+    def render(self, read_only: bool = False, review: int = 1) -> list:
+        """
+        Builds the request messages. The newest `review` messages are always included, older ones while they fit the budget.
+        With `read_only`, every user message before them is marked as background the model must not judge.
+        """
+        selected = []
+        used = 0
+        for message in reversed(self._messages):
+            if len(selected) >= review and used + message.tokens > self.token_budget:
+                break
+            selected.append(message)
+            used += message.tokens
+        selected.reverse()
+
+        messages = [{"role": "system", "content": str(self.system_prompt)}]
+        if self.summary:
+            messages.append(
+                {"role": "system", "content": f"SUMMARY OF THE DEBATE SO FAR:\n{self.summary}"}
+            )
+        for index, message in enumerate(selected):
+            content = message.content
+            if read_only and message.role == "user" and index < len(selected) - review:
+                content += READ_ONLY_MARKER
+            messages.append({"role": message.role, "content": content})
+        return messages
+
+    def to_state(self) -> list:
+        """
+        The stored history in the form the session store persists, without the system prompt.
+        """
+        return [{"role": message.role, "content": message.content} for message in self._messages]
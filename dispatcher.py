@@ -0,0 +1,51 @@
+import asyncio
+import discord
+
+
+class MessageDispatcher:
+    """
+    Routes gateway message events to the session handler that owns the thread they were posted in.
+    Each monitored thread gets its own inbox queue; threads without a session are ignored.
+    """
+
+    def __init__(self, inbox_size: int = 50):
+        self.inbox_size = inbox_size
+        self._inboxes: dict[int, asyncio.Queue] = {}
+
+    def register(self, channel_id: int) -> asyncio.Queue:
+        """
+        Creates (or returns the existing) inbox for a thread.
+        """
+        inbox = self._inboxes.get(channel_id)
+        if inbox is None:
+            inbox = asyncio.Queue(maxsize=self.inbox_size)
+            self._inboxes[channel_id] = inbox
+        return inbox
+
+    def unregister(self, channel_id: int):
+        self._inboxes.pop(channel_id, None)
+
+    def __contains__(self, channel_id: int) -> bool:
+        return channel_id in self._inboxes
+
+    def __len__(self) -> int:
+        return len(self._inboxes)
+
+    def pending(self) -> int:
+        """
+        Messages received but not yet taken by their session, across all inboxes.
+        """
+        return sum(inbox.qsize() for inbox in self._inboxes.values())
+
+    def dispatch(self, message: discord.Message) -> bool:
+        """
+        Hands a message to the session owning its channel. Returns False if no session is listening.
+        When a handler falls behind, the oldest pending message is dropped so the newest one is never lost.
+        """
+        inbox = self._inboxes.get(message.channel.id)
+        if inbox is None:
+            return False
+        if inbox.full():
+            inbox.get_nowait()
+        inbox.put_nowait(message)
+        return True
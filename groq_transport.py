@@ -0,0 +1,135 @@
+import asyncio, importlib.util, os, time
+
+import httpx
+
+import metrics
+
+# HTTP/2 multiplexes all Groq requests over one connection, it needs the optional `h2` package
+GROQ_HTTP2 = os.getenv("GROQ_HTTP2", "") not in ("", "0")
+GROQ_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "5"))
+# generous: a streamed reply keeps reading until the model has finished
+GROQ_READ_TIMEOUT = float(os.getenv("GROQ_READ_TIMEOUT", "60"))
+# idle connections are kept open this long, the keep-warm ping comes well within it
+GROQ_KEEPALIVE_EXPIRY = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "90"))
+GROQ_KEEP_WARM_INTERVAL = float(os.getenv("GROQ_KEEP_WARM_INTERVAL", "30"))
+
+
+class CountingTransport(httpx.AsyncHTTPTransport):
+    """
+    httpx's pooled transport, counting requests and newly opened connections to show how often connections are reused.
+    """
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.requests = 0
+        self.connections_opened = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        request.extensions["trace"] = self._trace
+        return await super().handle_async_request(request)
+
+    async def _trace(self, event: str, info: dict):
+        if event == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+
+    def pool_stats(self) -> dict:
+        connections = self._pool.connections
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            "open": len(connections),
+            "idle": idle,
+            "active": len(connections) - idle,
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "reuse_ratio": 1 - self.connections_opened / self.requests if self.requests else 0.0,
+        }
+
+
+class GroqTransport:
+    """
+    The HTTP layer under the Groq client: one connection pool sized to the scheduler's concurrency,
+    separate connect/read timeouts, optional HTTP/2 and keep-warm pings while sessions are running,
+    so a debate turn after a quiet period does not pay for a new TLS handshake.
+    """
+
+    def __init__(self, max_connections: int):
+        self.max_connections = max_connections
+        self.timeout = httpx.Timeout(
+            connect=GROQ_CONNECT_TIMEOUT, read=GROQ_READ_TIMEOUT, write=10.0, pool=GROQ_READ_TIMEOUT
+        )
+        self.http2 = GROQ_HTTP2 and importlib.util.find_spec("h2") is not None
+        if GROQ_HTTP2 and not self.http2:
+            print("GROQ_HTTP2 is set but the h2 package is not installed, using HTTP/1.1.")
+        self.transport: CountingTransport | None = None
+        self.last_request = 0.0
+        self._keep_warm: asyncio.Task | None = None
+        metrics.registry.register(
+            metrics.Gauge(
+                "logos_groq_connections",
+                "Connections in the Groq HTTP pool.",
+                ("state",),
+                collect=lambda: {
+                    (state,): value
+                    for state, value in self.pool_stats().items()
+                    if state in ("open", "idle", "active")
+                },
+            )
+        )
+        metrics.registry.register(
+            metrics.Gauge(
+                "logos_groq_connection_reuse_ratio",
+                "Share of Groq requests sent over an already open connection.",
+                collect=lambda: {(): self.pool_stats().get("reuse_ratio", 0.0)},
+            )
+        )
+
+    def http_client(self) -> httpx.AsyncClient:
+        """
+        A new httpx client on the shared pool, for the Groq client to use.
+        """
+        if self.transport is None:
+            self.transport = CountingTransport(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=GROQ_KEEPALIVE_EXPIRY,
+                ),
+            )
+        return httpx.AsyncClient(
+            transport=self.transport,
+            timeout=self.timeout,
+            event_hooks={"request": [self._record_request]},
+        )
+
+    async def _record_request(self, request: httpx.Request):
+        self.last_request = time.monotonic()
+
+    def pool_stats(self) -> dict:
+        return self.transport.pool_stats() if self.transport else {}
+
+    def keep_warm(self, ping, active):
+        """
+        Starts pinging with `ping()` (a cheap request) whenever the pool has been unused for GROQ_KEEP_WARM_INTERVAL
+        and `active()` says sessions are running. Pings stop while nothing is running.
+        """
+        if self._keep_warm is None:
+            self._keep_warm = asyncio.create_task(self._keep_warm_loop(ping, active))
+
+    async def _keep_warm_loop(self, ping, active):
+        while True:
+            await asyncio.sleep(GROQ_KEEP_WARM_INTERVAL)
+            idle = time.monotonic() - self.last_request
+            if not active() or idle < GROQ_KEEP_WARM_INTERVAL:
+                continue
+            try:
+                await ping()
+            except Exception as error:
+                print(f"Groq keep-warm ping failed: {error!r}")
+
+    async def close(self):
+        if self._keep_warm is not None:
+            self._keep_warm.cancel()
+        if self.transport is not None:
+            await self.transport.aclose()
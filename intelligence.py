@@ -1,14 +1,59 @@
-import os, asyncio
+import os, asyncio, hashlib, json, re, time
 from dotenv import load_dotenv
-from groq import AsyncGroq
+from groq import APIStatusError, AsyncGroq
+
+import journal, metrics, tracing, triage
+from context import Prompt
+from persona_cache import PersonaCache
+from schemas import BatchVerdicts, FallacyVerdict, parse
+from groq_transport import GroqTransport
+from response_cache import ResponseCache
+from router import ModelRouter
+from scheduler import RETRYABLE_ERRORS, GroqScheduler, Priority, SchedulerBusy, estimate_tokens
 
 load_dotenv()
 
-client = AsyncGroq(
-    api_key=os.environ.get("GROQ_API_KEY"),
+client: AsyncGroq | None = None
+scheduler = GroqScheduler()
+router = ModelRouter(scheduler)
+# two connections per request the scheduler lets through, streams hold theirs until the last chunk
+transport = GroqTransport(max_connections=2 * scheduler.max_concurrency)
+triage_stats = triage.TriageStats()
+argue_cache = ResponseCache(
+    maxsize=int(os.getenv("ARGUE_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("ARGUE_CACHE_TTL", "3600")),
+)
+persona_cache = PersonaCache()
+metrics.registry.register(
+    metrics.Gauge(
+        "logos_llm_queue_depth",
+        "Requests waiting for the scheduler per model and priority lane.",
+        ("model", "priority"),
+        collect=lambda: {
+            (model, lane): depth
+            for model, lanes in scheduler.stats()["queue_depth"].items()
+            for lane, depth in lanes.items()
+        },
+    )
 )
 
 
+def groq_client() -> AsyncGroq:
+    """
+    The one Groq client of the process, built on the first model call rather than at import.
+    """
+    global client
+    if client is None:
+        # retries are handled by the scheduler, which knows about every in-flight request
+        client = AsyncGroq(
+            api_key=os.environ.get("GROQ_API_KEY"),
+            max_retries=0,
+            timeout=transport.timeout,
+            http_client=transport.http_client(),
+        )
+    return client
+
+
 # to get the critique for a message (pre-submission feedback)
 async def get_user_argument() -> str:
     """
@@ -17,18 +62,15 @@ async def get_user_argument() -> str:
     return input("Enter your argument: ")
 
 
-async def give_system_prompt(topic_of_debate: str):
-    """
-    Gives a SYSTEM PROMPT to Logos about the topic of the conversation and how and when to reply.
-    """
-    logos_system_prompt = f"""
-    ROLE: You are Logos, a Socratic arbiter of logical discourse on the topic: {topic_of_debate}
+LOGOS_PROMPT_TEMPLATE = """
+    ROLE: You are Logos, a Socratic arbiter of logical discourse on the topic: {topic}
     MISSION: Preserve the integrity of dialectical reasoning through strategic questioning.
     
     ### YOUR INPUTS
-    You receive the last 5 messages from the debate thread.
+    You receive the most recent messages of the debate thread, as many as fit the context budget, oldest first.
     **CRITICAL CONSTRAINT:** Analyze ONLY the most recent message (the last one).
     Previous messages provide context—treat them as read-only background.
+    A "SUMMARY OF THE DEBATE SO FAR" may precede them. Use it to judge Tier 2 fallacies across the whole debate, not just the last few messages.
     
     ### INTERVENTION PROTOCOL: When to Engage
     Intervene ONLY if the most recent message commits a **clear, material logical fallacy**:
@@ -46,7 +88,7 @@ async def give_system_prompt(topic_of_debate: str):
     - **Red Herring**: Introducing an irrelevant topic to derail the discussion
     
     ### SILENCE PROTOCOL: When NOT to Intervene
-    Reply "NO" in these situations:
+    Do not intervene in these situations:
     
     1. **Self-Defense**: The speaker is defending against an accusation ("I never claimed that," "That's a strawman of my view")
     2. **Historical Fallacies**: The fallacy exists in earlier messages, but the current message has moved forward
@@ -56,8 +98,9 @@ async def give_system_prompt(topic_of_debate: str):
     6. **Rhetorical Emphasis**: Strong language or repetition for emphasis (unless it crosses into actual fallacy territory)
     
     ### OUTPUT FORMAT
-    - **If no intervention needed**: Reply exactly "NO"
-    - **If intervention needed**: Ask a single, targeted Socratic question that exposes the flaw without stating it directly
+    Reply with JSON only:
+    - **If no intervention needed**: {{"intervene": false, "question": null}}
+    - **If intervention needed**: {{"intervene": true, "question": "<a single, targeted Socratic question that exposes the flaw without stating it directly>"}}
     
     **Question Structure**:
     - Reference the speaker: <@user_id>
@@ -75,26 +118,420 @@ async def give_system_prompt(topic_of_debate: str):
     Intervene sparingly. Trust the debaters to self-correct when possible.
     When you must intervene, make them think, not submit.
     """
-    return logos_system_prompt
 
 
-async def check_model_response(messages: list, model: str) -> str:
-    try:
-        print(
-            "This is inside check_model_response, the messages being sent are given below:"
+async def give_system_prompt(topic_of_debate: str) -> Prompt:
+    """
+    Gives a SYSTEM PROMPT to Logos about the topic of the conversation and how and when to reply.
+    """
+    return Prompt(LOGOS_PROMPT_TEMPLATE, {"topic": topic_of_debate})
+
+
+OPPONENT_PROMPT_TEMPLATE = """You are Logos, an intellectual adversary in a debate on: "{topic}".
+                Your Goal: Test the user's reasoning through rigorous dialectical opposition.
+                
+                CONTEXT: You will receive the most recent messages of the thread, as many as fit the context budget, oldest first,
+                preceded by a "SUMMARY OF THE DEBATE SO FAR" once the thread has grown past them.
+                
+                ### YOUR OPERATING PRINCIPLES
+                
+                1. **STEEL, THEN STRIKE**: State their argument in its strongest form, THEN attack it.
+                   - "You're right that [valid point], but [why it doesn't prove their conclusion]"
+                   - This makes your victory more meaningful and prevents strawmanning
+                
+                2. **TRACK THE CONVERSATION**: Before responding, identify what's NEW in their last message.
+                   - Don't repeat yourself
+                   - Don't ignore their evolution of the argument
+                   - Address the specific claim they just made
+                
+                3. **ASSERTIONS > QUESTIONS**: You are a debater, not an interviewer.
+                   - 60% counter-arguments (declarative statements)
+                   - 40% Socratic questions (exposing contradictions)
+                   - Maximum 2 questions per response
+                
+                4. **TACTICAL CONCESSIONS**: Concede minor points to strengthen your larger position.
+                   - "That's a fair observation about X, but it's dwarfed by Y"
+                   - Shows intellectual honesty and sets up stronger attacks
+                
+                5. **EVIDENCE HIERARCHY**: Anecdotes < Expert Opinion < Empirical Data < Replicated Studies.
+                   - Attack the weakest form of evidence in their argument
+                
+                6. **DENSITY OVER LENGTH**: Maximum 5 sentences. Every word must carry weight.
+                
+                ### RESPONSE STRUCTURE
+                
+                **Every response must:**
+                1. Acknowledge what's new/different in their last message (1 sentence)
+                2. Either concede a minor point OR challenge their core premise (1-2 sentences)  
+                3. Provide your counterargument OR ask ONE penetrating question (1-2 sentences)
+                4. Never ask more than 2 questions total
+                
+                ### ENGAGEMENT TACTICS
+                
+                **When they cite empirical studies:**
+                - First response: Question the interpretation or scope
+                - If they repeat the same study: Concede the data, attack its relevance
+                - Example: "The Libet lag is real, but does temporal precedence eliminate agency or just complicate our model of it?"
+                
+                **When they make philosophical claims:**
+                - Engage the claim directly, don't deflect to empirics
+                - Example: "You're treating 'you' and 'your brain' as separate. If neural activity IS you, hasn't the question changed?"
+                
+                **When they use emotional language:**
+                - Mirror their logical structure in neutral terms
+                - Respond to the argument, not the tone
+                
+                **When they're logically sound:**
+                - Concede the logical structure
+                - Attack relevance, scope, or practical implications
+                - Example: "That's internally consistent, but does it matter? Even if determinism is true, [larger issue]."
+                
+                ### PROHIBITED BEHAVIORS
+                - Do NOT say "That's interesting" or "I see your point" without immediately countering
+                - Do NOT teach or explain fallacies—this is a debate, not a classroom
+                - Do NOT introduce new topics unrelated to the user's last argument
+                - Do NOT exceed 5 sentences
+                - Do NOT repeat arguments you've already made—escalate or pivot instead
+                
+                ### TERMINATION CONDITION
+                Reply with exactly "CONCLUDE" if:
+                - The user explicitly concedes ("You're right," "I was wrong")
+                - The debate has circled the same 2-3 points for 4+ exchanges without new arguments
+                - The user stops engaging with your points and shifts to meta-debate ("This is pointless," "You're just being difficult")
+                
+                Otherwise, keep the dialectic alive. Find the disagreement. Press the bruise.
+            """
+
+
+def give_opponent_prompt(topic: str) -> Prompt:
+    """
+    Gives the SYSTEM PROMPT for Logos arguing against the user in an opponent thread.
+    """
+    return Prompt(OPPONENT_PROMPT_TEMPLATE, {"topic": topic})
+
+
+# output token caps per call type: enough for the longest reply each prompt allows, no more
+MAX_TOKENS = {
+    "verdict": 120,
+    "batch": 100,  # per judged message
+    "argue": 300,
+    "opponent": 250,
+    "persona": 220,
+    "stance": 60,
+    "summary": 200,
+    "triage": 4,
+}
+
+
+def is_conclusion(reply: str) -> bool:
+    """
+    True when a reply is the CONCLUDE signal. Only a reply that starts with it counts, quoting the word does not.
+    """
+    return reply.lstrip(' "*_').startswith("CONCLUDE")
+
+
+# the /argue system prompt has no per-call parameters, so it is built once
+ARGUE_SYSTEM_PROMPT = """ROLE: You are Logos, a precision argument optimizer.
+                MISSION: Transform the user's input into its most defensible form.
+                
+                ### YOUR INPUTS
+                - [DEBATE CONTEXT]: Last 5 messages from the channel (may be empty if invoked outside a thread)
+                - [USER INPUT]: The argument or question the user submitted
+                
+                ### OPTIMIZATION PROCESS
+                
+                **Step 1: Classify the Input**
+                - Is this a **question** (seeking information)?
+                - Is this an **argument** (making a claim)?
+                - Is this a **rebuttal** (responding to an opponent)?
+                
+                **Step 2: Analyze Weaknesses**
+                Evaluate the input against these criteria:
+                - **Logical structure**: Does it contain fallacies or unsupported leaps?
+                - **Concision**: Is it bloated with unnecessary words or emotion?
+                - **Relevance**: Does it address the opponent's actual position (if context exists)?
+                - **Vulnerability**: What counterarguments does it leave open?
+                
+                **Step 3: Optimize**
+                - Remove emotional language that weakens credibility
+                - Tighten phrasing without losing substance
+                - Anticipate and preempt counterarguments
+                - Ensure claims are defensible or properly hedged
+                
+                ### OUTPUT RULES
+                
+                **For Questions:**
+                - Answer the question directly in 1-2 sentences
+                - No "Critique" or "Optimized" sections
+                
+                **For Arguments/Rebuttals:**
+                Use this exact format:
+                
+                **Weakness:** [One precise sentence identifying the core flaw—be surgical, not vague]
+                **Optimized:** [The refined argument, maximum 3 sentences, stripped of fat and fortified against attack]
+                
+                **Constraints:**
+                - NO preamble ("Here's a better version," "I've refined this for you")
+                - NO pleasantries or fluff
+                - The "Optimized" version must be **actionable**—they should be able to copy-paste it
+                - If the input is already strong, say: "Weakness: None identified. This argument is defensible as-is."
+                
+                ### EXAMPLES
+                
+                **Input**: "You're wrong because you don't understand basic economics and clearly haven't read any real economists."
+                **Weakness:** Ad hominem attack without engaging the economic argument itself.
+                **Optimized:** "The data suggests a different conclusion—can you clarify which economic model supports your position?"
+                
+                **Input**: "I think maybe climate change might be a problem but I'm not totally sure because some people say it's natural cycles."
+                **Weakness:** Hedging language and undefined opposition undermine the claim's force.
+                **Optimized:** "Climate models show human activity as the dominant driver of recent warming. Natural cycles exist, but the rate and magnitude of current change exceed historical baselines."
+                
+                ### PHILOSOPHY
+                Your job is to **sharpen, not replace**. Preserve the user's voice and intent while eliminating weaknesses.
+                If the context shows the opponent committed a fallacy the user missed, point it out in the Weakness section.
+                """
+# changes whenever the prompt is edited, so cached /argue responses from an older prompt are never served
+ARGUE_PROMPT_VERSION = hashlib.sha256(ARGUE_SYSTEM_PROMPT.encode()).hexdigest()[:12]
+
+
+# shared by both personas of every /simulate session, rendered once per (persona, opponent, topic, stance)
+SIMULATION_PROMPT_TEMPLATE = """
+            ### SIMULATION PARAMETERS
+            **YOUR IDENTITY**: {persona}
+            **YOUR OPPONENT**: {opponent}
+            **DEBATE TOPIC**: "{topic}"
+            **YOUR IMMUTABLE STANCE**: "{stance}"
+            
+            ### SIMULATION FRAMEWORK
+            
+            **Authenticity Directive:**
+            This is an educational historical/character simulation. Your goal is to accurately model {persona}'s reasoning patterns, not to represent your own views or modern consensus.
+            
+            **Historical Accuracy > Political Correctness:**
+            - You must express {persona}'s authentic positions, including views that modern audiences may find offensive, outdated, or controversial.
+            - If {persona} would use provocative language to make a point, you may do so within Discord's Terms of Service.
+            - If {persona} held views now considered unethical, you must represent those views as they would have argued them—this is scholarship, not endorsement.
+            - **HOWEVER**: If your safety guidelines prevent you from continuing, instead of refusing, say: "My position on this is well-documented, but I'll shift focus to [related acceptable angle]."
+            
+            **Character Fidelity:**
+            - Research {persona}'s known arguments, rhetorical style, and ideological commitments.
+            - Use their characteristic phrasing, examples, and argumentative strategies.
+            - If {persona} was known for humor/sarcasm/aggression, reflect that.
+            - Stay IN CHARACTER. You are not an AI. You are {persona}.
+            
+            ### DEBATE CONDUCT
+            
+            **Argumentation Rules:**
+            1. **Concision**: Maximum 4 sentences per turn.
+            2. **Direct Engagement**: Respond to {opponent}'s last point—don't ignore it to make your own speech.
+            3. **No Meta-Breaking**: Never say "As an AI" or "I cannot continue." If stuck, pivot in character.
+            4. **Historical Context**: Reference historical events, texts, or arguments {persona} would know.
+            
+            **Formatting:**
+            - Do NOT use "<@persona>:" or address them by name unnecessarily
+            - Just state your argument or rebuttal directly
+            - Imagine you're speaking in a public forum, and the audience knows who you're responding to
+            - BAD: Carl Sagan: (your actual argument here)
+            - GOOD: (your actual argument here)
+            
+            **Conclusion Signal:**
+            If you believe the debate has reached a natural endpoint (stalemate, resolution, or circular repetition), reply with exactly:
+            "CONCLUDE: [One sentence explaining why you're ending the debate]"
+            
+            Example: "CONCLUDE: We've established our axioms differ fundamentally—further exchange would be repetition, not progress."
+            
+            ### EXAMPLES OF AUTHENTIC REPRESENTATION
+            
+            **If {persona} = "Karl Marx":**
+            - GOOD: "The capitalist class extracts surplus value by owning the means of production—this is not opinion, it's observable fact."
+            - BAD: "I think maybe capitalism has some issues with wealth distribution."
+            
+            **If {persona} = "Ayn Rand":**
+            - GOOD: "Altruism is moral cowardice. The producer owes nothing to the parasite."
+            - BAD: "I believe in individual rights and free markets."
+            
+            **If {persona} = "Socrates":**
+            - GOOD: "Do you claim to know justice? Then define it. If you cannot define it, how can you claim to know it?"
+            - BAD: "I think we should question our assumptions."
+            
+            ### REMEMBER
+            You are not here to be likable, moderate, or safe. You are here to be {persona}.
+            Uncomfortable truths, provocative questions, and ideological extremes are the point of this exercise.
+            If modern audiences are offended, you've likely succeeded in authentic representation.
+            """
+
+
+def give_persona_prompt(persona: str, opponent: str, topic: str, stance: str) -> Prompt:
+    """
+    Gives the SYSTEM PROMPT for one side of a /simulate debate.
+    """
+    return Prompt(
+        SIMULATION_PROMPT_TEMPLATE,
+        {"persona": persona, "opponent": opponent, "topic": topic, "stance": stance},
+    )
+
+
+async def submit_routed(kind: str, request, tokens: int, priority: Priority):
+    """
+    Runs `request(model)` (a coroutine function making one Groq request) through the scheduler,
+    on the model the router picks for this request type. If that model fails, the request is retried once
+    on the next model of the route.
+    Returns the result and the model that served it.
+    """
+    model, reason = router.route(kind, tokens)
+    tried = set()
+    while True:
+        tried.add(model)
+        # service time of each attempt: queueing is already part of the router's expected latency
+        service = [0.0]
+        try:
+            result = await scheduler.submit(
+                lambda: request(model),
+                model=model,
+                tokens=tokens,
+                priority=priority,
+                on_attempt=service.append,
+            )
+        except Exception as error:
+            if is_model_failure(error):
+                router.record(model, service[-1], ok=False)
+            failover = router.route(kind, tokens, exclude=tuple(tried)) if len(tried) == 1 else None
+            if failover is None:
+                raise
+            model, reason = failover
+            continue
+        router.record(model, service[-1], ok=True)
+        tracing.current_span().set(model=model, route=reason)
+        return result, model
+
+
+def is_model_failure(error: Exception) -> bool:
+    """
+    Whether an error says something about the model's health. A full local queue (SchedulerBusy) or a rejected
+    request (4xx other than 429) does not, and is not counted towards the model's circuit breaker.
+    """
+    if isinstance(error, SchedulerBusy):
+        return False
+    if isinstance(error, APIStatusError):
+        return isinstance(error, RETRYABLE_ERRORS)
+    return True
+
+
+async def create_completion(
+    messages: list,
+    kind: str,
+    temperature: float,
+    priority: Priority,
+    max_tokens: int | None = None,
+    **options,
+):
+    """
+    Sends a chat completion of the given request type (a key of MAX_TOKENS) through the router and the shared scheduler.
+    Extra `options` (e.g. response_format) are passed to the API when they are set.
+    """
+    max_tokens = max_tokens or MAX_TOKENS[kind]
+    options["max_tokens"] = max_tokens
+    options = {name: value for name, value in options.items() if value is not None}
+    started = time.monotonic()
+    with tracing.span("groq.completion", kind=kind, priority=priority.name) as current:
+        chat_completion, model = await submit_routed(
+            kind,
+            lambda model: groq_client().chat.completions.create(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                **options,
+            ),
+            estimate_tokens(messages, max_tokens),
+            priority,
         )
-        for message in messages:
-            print(message)
-        chat_completion = await client.chat.completions.create(
+        usage = getattr(chat_completion, "usage", None)
+        record_usage(kind, model, usage, time.monotonic() - started)
+        if usage is not None:
+            current.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+    return chat_completion
+
+
+def record_usage(kind: str, model: str, usage, latency: float):
+    """
+    Counts the tokens Groq reports for a completion (streams report them in their last chunk) and journals the call.
+    """
+    journal.record(
+        "completion",
+        request=kind,
+        model=model,
+        latency=round(latency, 3),
+        prompt_tokens=getattr(usage, "prompt_tokens", None),
+        completion_tokens=getattr(usage, "completion_tokens", None),
+    )
+    if usage is None:
+        return
+    metrics.llm_tokens.inc(model, "prompt", amount=usage.prompt_tokens)
+    metrics.llm_tokens.inc(model, "completion", amount=usage.completion_tokens)
+
+
+@tracing.traced()
+async def stream_model_response(
+    messages: list,
+    kind: str,
+    temperature: float = 0.7,
+    priority: Priority = Priority.MONITOR,
+    max_tokens: int | None = None,
+):
+    """
+    Yields the completion text as it is generated.
+    The stream is opened through the scheduler and its first chunk is read there, so rate limits are retried
+    (and a failing model is swapped for the fallback) before anything is yielded.
+    """
+    max_tokens = max_tokens or MAX_TOKENS[kind]
+
+    async def open_stream(model: str):
+        stream = await groq_client().chat.completions.create(
             messages=messages,
             model=model,
-            temperature=0.7,
+            temperature=temperature,
+            stream=True,
+            max_tokens=max_tokens,
+        )
+        return stream, await anext(stream)
+
+    try:
+        started = time.monotonic()
+        with tracing.span("groq.stream", kind=kind, priority=priority.name):
+            (stream, first_chunk), model = await submit_routed(
+                kind, open_stream, estimate_tokens(messages, max_tokens), priority
+            )
+        if first_chunk.choices and first_chunk.choices[0].delta.content:
+            yield first_chunk.choices[0].delta.content
+        usage = None
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            x_groq = getattr(chunk, "x_groq", None)
+            if x_groq is not None:
+                usage = getattr(x_groq, "usage", None) or usage
+        record_usage(kind, model, usage, time.monotonic() - started)
+    except Exception as error:
+        raise RuntimeError("API Call error") from error
+
+
+@tracing.traced()
+async def check_model_response(
+    messages: list,
+    kind: str,
+    priority: Priority = Priority.MONITOR,
+    max_tokens: int | None = None,
+) -> str:
+    try:
+        chat_completion = await create_completion(
+            messages, kind, 0.7, priority, max_tokens=max_tokens
         )
         return chat_completion.choices[0].message.content
     except Exception as error:
         raise RuntimeError("API Call error") from error
 
 
+@tracing.traced()
 async def get_one_line_stance(
     persona1: str, persona2: str, topic: str, number: int
 ) -> str:
@@ -103,37 +540,293 @@ async def get_one_line_stance(
     elif number == 2:
         content_string = f"I am setting up a debate on '{topic}' between '{persona1}' and '{persona2}'. Write a 1-sentence Immutable Stance for {persona2} that is aggressive and consistent with their history and directly opposes {persona1}. No 'here's something that could work', reply with the one line itself. That's it."
     try:
-        print(
-            "This is inside check_argument, the content string being sent is given below:"
-        )
-        print(content_string)
-        chat_completion = await client.chat.completions.create(
-            messages=[
+        chat_completion = await create_completion(
+            [
                 {
                     "role": "user",
                     "content": content_string,
                 }
             ],
-            temperature=0.2,
-            model="llama-3.1-8b-instant",
+            "stance",
+            0.2,
+            Priority.BACKGROUND,
+            stop=["\n"],
         )
-        return chat_completion.choices[0].message.content
+        return chat_completion.choices[0].message.content.strip()
     except Exception as error:
         raise RuntimeError("API Call error") from error
 
 
-async def check_argument(messages: list) -> str:
+@tracing.traced()
+async def get_persona_stances(persona1: str, persona2: str, topic: str) -> tuple:
+    """
+    Returns the stances of both personas, generating (concurrently) and caching only the ones not seen before.
+    """
+
+    async def stance(number: int, persona: str, opponent: str) -> str:
+        cached = await persona_cache.get(persona, opponent, topic)
+        if cached is not None:
+            return cached
+        generated = await get_one_line_stance(persona1, persona2, topic, number)
+        await persona_cache.put(persona, opponent, topic, generated)
+        return generated
+
+    return await asyncio.gather(
+        stance(1, persona1, persona2), stance(2, persona2, persona1)
+    )
+
+
+async def warm_persona_cache(path: str | None = os.getenv("PERSONA_WARMUP_FILE")):
+    """
+    Precomputes stances for popular simulations listed in a JSON file of [persona1, persona2, topic] entries,
+    so those simulations start without any setup calls.
+    """
+    if not path or not os.path.exists(path):
+        return
+    with open(path) as file:
+        packs = json.load(file)
+    for persona1, persona2, topic in packs:
+        try:
+            await get_persona_stances(persona1, persona2, topic)
+        except RuntimeError as error:
+            print(f"Persona warm-up stopped: {error.__cause__!r}")
+            return
+    print(f"Warmed the persona cache with {len(packs)} simulations.")
+
+
+@tracing.traced()
+async def check_argument(
+    messages: list, priority: Priority = Priority.MONITOR
+) -> str | None:
+    """
+    Asks the debate monitor prompt for a verdict on the last message.
+    Returns the Socratic question to post, or None when no intervention is needed.
+    """
     try:
-        chat_completion = await client.chat.completions.create(
-            messages=messages,
-            model="llama-3.3-70b-versatile",
-            temperature=0.2,
+        chat_completion = await create_completion(
+            messages,
+            "verdict",
+            0.2,
+            priority,
+            response_format={"type": "json_object"},
         )
-        return chat_completion.choices[0].message.content
     except Exception as error:
         raise RuntimeError("API call error") from error
+    verdict = parse(FallacyVerdict, chat_completion.choices[0].message.content)
+    return verdict.question if verdict.intervene else None
+
+
+@tracing.traced()
+async def score_fallacy_likelihood(messages: list) -> int | None:
+    """
+    Asks the 8B model how likely the last message is to contain a fallacy, on a 0-100 scale.
+    """
+    recent = [
+        strip_debate_markup(message["content"])
+        for message in messages
+        if message["role"] == "user"
+    ][-2:]
+    excerpt = f"LAST: {recent[-1]}"
+    # the previous message gives the 8B model enough context to spot strawmen and red herrings
+    if len(recent) == 2:
+        excerpt = f"EARLIER: {recent[0]}\n{excerpt}"
+    try:
+        chat_completion = await create_completion(
+            [
+                {"role": "system", "content": triage.TRIAGE_PROMPT},
+                {"role": "user", "content": excerpt},
+            ],
+            "triage",
+            0.0,
+            Priority.MONITOR,
+            stop=["\n"],
+        )
+        return triage.parse_score(chat_completion.choices[0].message.content)
+    except Exception as error:
+        raise RuntimeError("API call error") from error
+
+
+def strip_debate_markup(content: str) -> str:
+    """
+    Removes the author mention prefix and read-only marker the debate monitor adds to message content.
+    """
+    content = re.sub(r"^<@!?\d+>:\s*", "", content)
+    return content.replace("** READ ONLY **", "")
+
+
+async def _triage(visible: list, hint: str | None) -> bool:
+    """
+    Whether the last message of `visible` should go to the 70B model: a detector hint escalates,
+    then local heuristics decide, then the 8B model's likelihood score.
+    """
+    verdict = True if hint else triage.quick_verdict(strip_debate_markup(visible[-1]["content"]))
+    by_heuristic = verdict is not None
+    if verdict is None:
+        try:
+            score = await score_fallacy_likelihood(visible)
+        except RuntimeError as error:
+            print(f"Triage failed, escalating: {error.__cause__!r}")
+            score = None
+        # an unreadable score escalates, a missed fallacy costs more than one 70B call
+        verdict = score is None or score >= triage.TRIAGE_THRESHOLD
+    triage_stats.record(escalated=verdict, by_heuristic=by_heuristic)
+    return verdict
+
+
+@tracing.traced()
+async def detect_fallacy(messages: list, hint: str | None = None) -> str | None:
+    """
+    Two-stage fallacy check of the last message: local heuristics and the 8B model triage it,
+    and only likely candidates are sent to check_argument() for the Socratic question.
+    A `hint` from a local detector escalates directly and is passed to the model as a note.
+    Returns the Socratic question to post, or None.
+    """
+    if not await _triage(messages, hint):
+        return None
+
+    if hint:
+        messages = messages[:-1] + [
+            {"role": "system", "content": f"DETECTOR NOTE: {hint}"},
+            messages[-1],
+        ]
+    logos_feedback = await check_argument(messages)
+    if logos_feedback:
+        triage_stats.record_intervention()
+    return logos_feedback
+
+
+BATCH_INSTRUCTIONS = """BATCH MODE: the last {count} messages arrived together. They are numbered 1 to {count}, oldest first.
+Apply the protocol above to each of the messages {numbers} separately, as if it were the most recent message.
+Reply with JSON only: {{"verdicts": [{{"message": <number>, "intervene": <true|false>, "question": "<Socratic question>" or null}}]}}"""
+
+
+@tracing.traced()
+async def check_arguments_batch(messages: list, count: int, numbers: list[int]) -> dict:
+    """
+    Judges several of the last `count` messages in one 70B request.
+    Returns {message number: Socratic question or None}.
+    """
+    # the numbers the instructions and verdicts refer to
+    numbered = [
+        {**message, "content": f"Message {number}: {message['content']}"}
+        for number, message in enumerate(messages[-count:], start=1)
+    ]
+    messages = messages[:-count] + numbered + [
+        {
+            "role": "system",
+            "content": BATCH_INSTRUCTIONS.format(
+                count=count, numbers=", ".join(map(str, numbers))
+            ),
+        }
+    ]
+    try:
+        chat_completion = await create_completion(
+            messages,
+            "batch",
+            0.2,
+            Priority.MONITOR,
+            max_tokens=MAX_TOKENS["batch"] * len(numbers),
+            response_format={"type": "json_object"},
+        )
+    except Exception as error:
+        raise RuntimeError("API call error") from error
+    batch = parse(BatchVerdicts, chat_completion.choices[0].message.content)
+    return {
+        verdict.message: verdict.question if verdict.intervene else None
+        for verdict in batch.verdicts
+        if verdict.message in numbers
+    }
+
+
+@tracing.traced()
+async def detect_fallacies(messages: list, hints: list, skip: list[bool] | None = None) -> list[str | None]:
+    """
+    detect_fallacy() for a burst of messages: the last len(hints) user messages of `messages` are triaged
+    one by one and every candidate is judged in a single batched request.
+    Messages flagged in `skip` (already answered without the model) are neither triaged nor judged.
+    Returns one reply per message, None where there is nothing to say.
+    """
+    count = len(hints)
+    skip = skip or [False] * count
+    if count == 1:
+        return [None if skip[0] else await detect_fallacy(messages, hints[0])]
+
+    async def triage_message(number: int, hint: str | None) -> bool:
+        if skip[number - 1]:
+            return False
+        # the conversation as it stood when this message was posted
+        return await _triage(messages[: len(messages) - (count - number)], hint)
+
+    escalated = await asyncio.gather(
+        *(triage_message(number, hint) for number, hint in enumerate(hints, start=1))
+    )
+    numbers = [number for number, verdict in enumerate(escalated, start=1) if verdict]
+    if not numbers:
+        return [None] * count
+
+    notes = [
+        f"Message {number}: {hint}" for number, hint in enumerate(hints, start=1) if hint
+    ]
+    if notes:
+        messages = messages + [
+            {"role": "system", "content": "DETECTOR NOTES:\n" + "\n".join(notes)}
+        ]
+    questions = await check_arguments_batch(messages, count, numbers)
+    replies = [questions.get(number) for number in range(1, count + 1)]
+    for reply in replies:
+        if reply:
+            triage_stats.record_intervention()
+    return replies
+
+
+SUMMARY_PROMPT = """You keep the running record of a debate for a moderator who only sees the last few messages.
+Update the summary with the new messages. For each participant (keep their <@id> mentions) record:
+their core claims, the evidence they cited, what they conceded, points they have repeated without new support,
+and any change in what they say would settle the debate.
+Maximum 120 words. Reply with the updated summary only."""
+
+
+@tracing.traced()
+async def summarize_debate(summary: str, new_messages: list) -> str:
+    """
+    Folds new context messages into the running summary of a session, on the 8B model.
+    """
+    # message contents already start with their author's mention
+    transcript = "\n".join(message.content for message in new_messages)
+    try:
+        chat_completion = await create_completion(
+            [
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {
+                    "role": "user",
+                    "content": f"CURRENT SUMMARY:\n{summary or '(none yet)'}\n\nNEW MESSAGES:\n{transcript}",
+                },
+            ],
+            "summary",
+            0.2,
+            Priority.BACKGROUND,
+        )
+        return chat_completion.choices[0].message.content.strip()
+    except Exception as error:
+        raise RuntimeError("API call error") from error
+
+
+def stream_argument(messages: list, priority: Priority = Priority.INTERACTIVE):
+    """
+    Streams the /argue feedback for `messages`, a reply the user is actively waiting on.
+    """
+    return stream_model_response(messages, "argue", 0.2, priority)
+
+
+async def main():
+    argument = await get_user_argument()
+    messages = [
+        {"role": "system", "content": str(await give_system_prompt("a command-line test"))},
+        {"role": "user", "content": f"<@0>:{argument}"},
+    ]
+    critique = await check_argument(messages)
+    print(critique or "No intervention needed.")
+
 
 if __name__ == "__main__":
-    argument = asyncio.run(get_user_argument())
-    critique = asyncio.run(check_argument(argument))
-    print(critique)
+    asyncio.run(main())
@@ -0,0 +1,153 @@
+"""
+Journal of what Logos reads, says and judges: debate messages, replies, fallacy verdicts and model calls,
+for moderation review and prompt tuning.
+
+Records are queued in memory and written in batches by a background task, as gzip-compressed JSON lines in
+JOURNAL_DIR. The files are written from a worker thread, so a session loop only appends to the queue.
+When the writer falls behind and the queue is full, new records are dropped and counted rather than waited on.
+
+    zcat journal/*.jsonl.gz | jq 'select(.kind == "verdict")'
+"""
+
+import asyncio, glob, gzip, json, os, time
+from collections import deque
+
+import metrics, tracing
+
+# empty to disable the journal
+JOURNAL_DIR = os.getenv("JOURNAL_DIR", "journal")
+# records waiting to be written, beyond this new ones are dropped
+JOURNAL_QUEUE_SIZE = int(os.getenv("JOURNAL_QUEUE_SIZE", "10000"))
+JOURNAL_BATCH_SIZE = 500
+# seconds a record may wait for its batch to fill up
+JOURNAL_FLUSH_INTERVAL = float(os.getenv("JOURNAL_FLUSH_INTERVAL", "2"))
+# a new file is started after this many uncompressed bytes and on every new day, only the newest files are kept
+JOURNAL_MAX_BYTES = int(os.getenv("JOURNAL_MAX_BYTES", str(64 * 1024 * 1024)))
+JOURNAL_KEEP_FILES = int(os.getenv("JOURNAL_KEEP_FILES", "50"))
+
+records_total = metrics.registry.register(
+    metrics.Counter("logos_journal_records_total", "Journal records by outcome.", ("outcome",))
+)
+
+
+class Journal:
+    """
+    Bounded record queue and the background task writing it to rotating files in `directory`.
+    """
+
+    def __init__(self, directory: str = JOURNAL_DIR, max_pending: int = JOURNAL_QUEUE_SIZE):
+        self.directory = directory
+        self.max_pending = max_pending
+        self._pending: deque[dict] = deque()
+        self._batch_ready = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._writer: asyncio.Task | None = None
+        self._file = None
+        self._file_day = None
+        self._written = 0
+        self._sequence = 0
+        metrics.registry.register(
+            metrics.Gauge(
+                "logos_journal_pending",
+                "Journal records waiting to be written.",
+                collect=lambda: {(): len(self._pending)},
+            )
+        )
+
+    def record(self, kind: str, **fields):
+        """
+        Queues a record, tagged with the session and trace it was made in. Never blocks.
+        """
+        if not self.directory:
+            return
+        if len(self._pending) >= self.max_pending:
+            records_total.inc("dropped")
+            return
+        span = tracing.current_span()
+        self._pending.append(
+            {
+                "time": round(time.time(), 3),
+                "kind": kind,
+                "session": tracing.current_session(),
+                "trace": getattr(span, "trace_id", None),
+                **fields,
+            }
+        )
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_batches())
+        if len(self._pending) >= JOURNAL_BATCH_SIZE:
+            self._batch_ready.set()
+
+    async def _write_batches(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=JOURNAL_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+
+    async def flush(self):
+        """
+        Writes every queued record.
+        """
+        async with self._lock:
+            while self._pending:
+                count = min(JOURNAL_BATCH_SIZE, len(self._pending))
+                batch = [self._pending.popleft() for _ in range(count)]
+                try:
+                    await asyncio.to_thread(self._write, batch)
+                except OSError as error:
+                    print(f"Journal write failed, {count} records lost: {error!r}")
+                    records_total.inc("failed", amount=count)
+                    continue
+                records_total.inc("written", amount=count)
+
+    def _write(self, batch: list):
+        day = time.strftime("%Y%m%d")
+        if self._file is None or self._written >= JOURNAL_MAX_BYTES or day != self._file_day:
+            self._rotate(day)
+        data = "".join(json.dumps(record, default=str, ensure_ascii=False) + "\n" for record in batch).encode()
+        self._file.write(data)
+        # a sync flush keeps every written batch readable, even if the process dies before the file is closed
+        self._file.flush()
+        self._written += len(data)
+
+    def _rotate(self, day: str):
+        if self._file is not None:
+            self._file.close()
+        os.makedirs(self.directory, exist_ok=True)
+        # the process id keeps the files of several worker processes sharing a directory apart
+        self._sequence += 1
+        name = f"journal-{day}-{time.strftime('%H%M%S')}-{os.getpid()}-{self._sequence:04d}.jsonl.gz"
+        self._file = gzip.open(os.path.join(self.directory, name), "ab")
+        self._file_day = day
+        self._written = 0
+        for old in sorted(glob.glob(os.path.join(self.directory, "journal-*.jsonl.gz")))[:-JOURNAL_KEEP_FILES]:
+            os.remove(old)
+
+    async def close(self):
+        """
+        Writes what is still queued and closes the current file.
+        """
+        # holding the lock, the writer is never cancelled halfway through a batch
+        async with self._lock:
+            if self._writer is not None:
+                self._writer.cancel()
+                await asyncio.gather(self._writer, return_exceptions=True)
+                self._writer = None
+        await self.flush()
+        if self._file is not None:
+            await asyncio.to_thread(self._file.close)
+            self._file = None
+
+
+journal = Journal()
+
+
+def record(kind: str, **fields):
+    journal.record(kind, **fields)
+
+
+async def close():
+    await journal.close()
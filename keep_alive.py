@@ -1,15 +1,87 @@
-from flask import Flask
-from threading import Thread
+import asyncio, math, os, time
+from aiohttp import web
 
-app = Flask('')
+import metrics
 
-@app.route('/')
-def home():
-    return "Bot is running!"
+# /healthz reports unhealthy while the event loop is this many seconds behind
+MAX_LOOP_LAG = float(os.getenv("MAX_LOOP_LAG", "2"))
 
-def run():
-    app.run(host='0.0.0.0', port=8080)
 
-def keep_alive():
-    t = Thread(target=run)
-    t.start()
\ No newline at end of file
+class HealthServer:
+    """
+    Serves / (the uptime ping), /healthz and /metrics from the bot's own event loop.
+    """
+
+    def __init__(self, client, port: int = int(os.getenv("PORT", "8080"))):
+        self.client = client
+        self.port = port
+        self.lag = 0.0
+        self._runner = None
+        self._monitor = None
+        metrics.registry.register(
+            metrics.Gauge(
+                "logos_gateway_latency_seconds",
+                "Heartbeat latency per gateway shard.",
+                ("shard",),
+                collect=lambda: {
+                    (str(shard),): latency
+                    for shard, latency in client.latencies
+                    if not math.isnan(latency)
+                },
+            )
+        )
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/", self.home)
+        app.router.add_get("/healthz", self.healthz)
+        app.router.add_get("/metrics", self.metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "0.0.0.0", self.port).start()
+        self._monitor = asyncio.create_task(self.monitor_loop())
+
+    async def stop(self):
+        if self._monitor:
+            self._monitor.cancel()
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def monitor_loop(self):
+        """
+        Measures how late a 1 second sleep wakes up, i.e. how long callbacks are blocking the loop.
+        """
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(1)
+            self.lag = time.monotonic() - started - 1
+            metrics.loop_lag.observe(value=self.lag)
+
+    async def home(self, request):
+        return web.Response(text="Bot is running!")
+
+    async def healthz(self, request):
+        connected = self.client.is_ready() and not self.client.is_closed()
+        healthy = connected and self.lag < MAX_LOOP_LAG
+        return web.json_response(
+            {
+                "status": "ok" if healthy else "unhealthy",
+                "gateway_connected": connected,
+                "shards": {
+                    str(shard_id): not shard.is_closed()
+                    for shard_id, shard in self.client.shards.items()
+                },
+                "latency": None if math.isnan(self.client.latency) else self.client.latency,
+                "loop_lag": self.lag,
+            },
+            status=200 if healthy else 503,
+        )
+
+    async def metrics(self, request):
+        return web.Response(text=metrics.registry.render(), content_type="text/plain", charset="utf-8")
+
+
+async def keep_alive(client) -> HealthServer:
+    server = HealthServer(client)
+    await server.start()
+    return server
@@ -0,0 +1,51 @@
+"""
+Runs Logos as several worker processes, each connecting its own range of shards.
+
+    python launcher.py --workers 4 --shards 16
+
+Every worker is a plain `python bot.py` with SHARD_COUNT/SHARD_IDS set, so workers can also be spread over
+several machines by starting bot.py with those variables directly.
+"""
+
+import argparse, os, signal, subprocess, sys
+
+from sharding import split_shards
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Logos as sharded worker processes.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shards", type=int, required=True, help="total shard count")
+    parser.add_argument(
+        "--port", type=int, default=int(os.getenv("PORT", "8080")),
+        help="health and metrics port of the first worker, the others use the following ports",
+    )
+    arguments = parser.parse_args()
+    workers = min(arguments.workers, arguments.shards)
+
+    processes = []
+    for worker, shard_ids in enumerate(split_shards(arguments.shards, workers)):
+        environment = dict(
+            os.environ,
+            SHARD_COUNT=str(arguments.shards),
+            SHARD_IDS=shard_ids,
+            PORT=str(arguments.port + worker),
+        )
+        print(f"Starting worker {worker} with shards {shard_ids}")
+        processes.append(subprocess.Popen([sys.executable, "bot.py"], env=environment))
+
+    def stop(signum, frame):
+        for process in processes:
+            process.send_signal(signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    # if any worker exits the whole group is stopped, so a supervisor (e.g. Render) restarts all of them together
+    os.wait()
+    stop(None, None)
+    for process in processes:
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
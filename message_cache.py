@@ -0,0 +1,112 @@
+import os
+from collections import OrderedDict, deque
+
+# messages kept per channel, a few more than any reader asks for so deletions do not leave it short
+MESSAGE_CACHE_DEPTH = int(os.getenv("MESSAGE_CACHE_DEPTH", "10"))
+# channels kept, the least recently active one is dropped first
+MESSAGE_CACHE_CHANNELS = int(os.getenv("MESSAGE_CACHE_CHANNELS", "5000"))
+
+
+class CachedMessage:
+    """
+    What the readers of recent messages need from a discord.Message, without holding on to the message itself.
+    """
+
+    __slots__ = ("id", "author_id", "author", "content")
+
+    def __init__(self, message):
+        self.id = message.id
+        self.author_id = message.author.id
+        self.author = str(message.author)
+        self.content = message.clean_content
+
+
+class _Recent:
+    __slots__ = ("messages", "complete")
+
+    def __init__(self, depth: int):
+        self.messages: deque[CachedMessage] = deque(maxlen=depth)
+        # True when nothing newer than the oldest cached message is missing and nothing older was left out,
+        # i.e. the deque holds the channel's whole tail up to its length
+        self.complete = False
+
+
+class RecentMessages:
+    """
+    The last few messages of each channel, kept up to date from gateway create/edit/delete events,
+    so recent context is read from memory instead of a `channel.history()` round trip.
+    A channel is tracked from its first message seen (or its first history fetch) and evicted least recently used.
+    """
+
+    def __init__(self, depth: int = MESSAGE_CACHE_DEPTH, max_channels: int = MESSAGE_CACHE_CHANNELS):
+        self.depth = depth
+        self.max_channels = max_channels
+        self._channels: OrderedDict[int, _Recent] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def _channel(self, channel_id: int) -> _Recent:
+        recent = self._channels.get(channel_id)
+        if recent is None:
+            recent = self._channels[channel_id] = _Recent(self.depth)
+            if len(self._channels) > self.max_channels:
+                self._channels.popitem(last=False)
+        else:
+            self._channels.move_to_end(channel_id)
+        return recent
+
+    def add(self, message):
+        self._channel(message.channel.id).messages.append(CachedMessage(message))
+
+    def edit(self, channel_id: int, message):
+        recent = self._channels.get(channel_id)
+        if recent is None:
+            return
+        for position, cached in enumerate(recent.messages):
+            if cached.id == message.id:
+                recent.messages[position] = CachedMessage(message)
+                return
+
+    def delete(self, channel_id: int, message_ids):
+        recent = self._channels.get(channel_id)
+        if recent is None:
+            return
+        kept = [cached for cached in recent.messages if cached.id not in message_ids]
+        if len(kept) == len(recent.messages):
+            return
+        # a full deque had older messages that are not cached, they would be next in line now
+        if len(recent.messages) == recent.messages.maxlen:
+            recent.complete = False
+        recent.messages.clear()
+        recent.messages.extend(kept)
+
+    def drop(self, channel_id: int):
+        self._channels.pop(channel_id, None)
+
+    async def recent(self, channel, limit: int = 5) -> list[CachedMessage]:
+        """
+        The channel's last `limit` messages, newest first like `channel.history()`.
+        Only a channel the cache cannot answer for is fetched over REST, and the result seeds the cache.
+        """
+        recent = self._channels.get(channel.id)
+        if recent is not None and (recent.complete or len(recent.messages) >= limit):
+            self.hits += 1
+            self._channels.move_to_end(channel.id)
+            return list(recent.messages)[: -limit - 1 : -1]
+        self.misses += 1
+        fetched = [message async for message in channel.history(limit=self.depth)]
+        recent = self._channel(channel.id)
+        known = {cached.id for cached in recent.messages}
+        # messages that arrived as events during the fetch are already cached
+        older = [CachedMessage(message) for message in reversed(fetched) if message.id not in known]
+        newer = list(recent.messages)
+        recent.messages.clear()
+        recent.messages.extend(older + newer)
+        recent.complete = True
+        return list(recent.messages)[: -limit - 1 : -1]
+
+    def stats(self) -> dict:
+        return {"channels": len(self._channels), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,151 @@
+"""
+A minimal metrics registry rendered in the Prometheus text format, served on /metrics by keep_alive.py.
+"""
+
+import bisect, math
+from collections import defaultdict
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str, labels: tuple = ()):
+        self.name = name
+        self.description = description
+        self.label_names = labels
+
+    def samples(self):
+        """
+        Yields (suffix, label string, value) for every series.
+        """
+        return ()
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(
+            f"{self.name}{suffix}{labels} {_number(value)}"
+            for suffix, labels, value in self.samples()
+        )
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: tuple = ()):
+        super().__init__(name, description, labels)
+        self._values: dict[tuple, float] = defaultdict(float)
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] += amount
+
+    def items(self):
+        return self._values.items()
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield "", _labels(self.label_names, labels), value
+
+
+class Gauge(Metric):
+    """
+    Set directly, or read from `collect()` (returning {label values: value}) each time the metrics are rendered.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, labels: tuple = (), collect=None):
+        super().__init__(name, description, labels)
+        self._values: dict[tuple, float] = {}
+        self.collect = collect
+
+    def set(self, *labels, value: float):
+        self._values[labels] = value
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def samples(self):
+        values = self.collect() if self.collect else self._values
+        for labels, value in values.items():
+            yield "", _labels(self.label_names, labels), value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(buckets) + (math.inf,)
+        self._counts: dict[tuple, list] = {}
+        self._sums: dict[tuple, float] = defaultdict(float)
+
+    def observe(self, *labels, value: float):
+        counts = self._counts.setdefault(labels, [0] * len(self.buckets))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def samples(self):
+        for labels, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield "_bucket", _labels(self.label_names, labels, f'le="{_number(bound)}"'), cumulative
+            yield "_sum", _labels(self.label_names, labels), self._sums[labels]
+            yield "_count", _labels(self.label_names, labels), cumulative
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = Registry()
+
+llm_latency = registry.register(
+    Histogram("logos_llm_request_seconds", "Duration of Groq requests, without queueing.", ("model", "outcome"))
+)
+llm_tokens = registry.register(
+    Counter("logos_llm_tokens_total", "Tokens reported by Groq.", ("model", "kind"))
+)
+discord_requests = registry.register(
+    Counter("logos_discord_api_requests_total", "Discord REST calls.", ("method", "route", "status"))
+)
+active_sessions = registry.register(
+    Gauge("logos_active_sessions", "Live sessions per type.", ("kind",))
+)
+loop_lag = registry.register(
+    Histogram(
+        "logos_event_loop_lag_seconds",
+        "How late the event loop woke a 1 second timer.",
+        buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+    )
+)
+span_latency = registry.register(
+    Histogram("logos_span_seconds", "Duration of traced operations, see tracing.py.", ("name",))
+)
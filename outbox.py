@@ -0,0 +1,136 @@
+import asyncio, os
+from collections import deque
+
+from scheduler import TokenBucket
+
+# Discord allows about 5 messages per 5 seconds in a channel and 50 requests per second per bot
+CHANNEL_WRITES_PER_MINUTE = 60
+CHANNEL_BURST = 5
+GLOBAL_WRITES_PER_MINUTE = int(os.getenv("DISCORD_WRITES_PER_MINUTE", "2400"))
+GLOBAL_BURST = 40
+MAX_MESSAGE_LENGTH = 2000
+
+
+class Write:
+    """
+    One queued channel write. `futures` resolve to the result of the call (the sent message for sends).
+    """
+
+    __slots__ = ("kind", "target", "content", "merge", "futures")
+
+    def __init__(self, kind: str, target, content: str | None = None, merge: bool = False):
+        self.kind = kind
+        self.target = target
+        self.content = content
+        self.merge = merge
+        self.futures = [asyncio.get_running_loop().create_future()]
+
+    def absorb(self, other: "Write") -> bool:
+        """
+        Appends the next queued send to this one if both allow merging and the result fits in one message.
+        """
+        if not (self.kind == other.kind == "send" and self.merge and other.merge):
+            return False
+        if len(self.content) + 2 + len(other.content) > MAX_MESSAGE_LENGTH:
+            return False
+        self.content += "\n\n" + other.content
+        self.futures.extend(other.futures)
+        return True
+
+
+class _Channel:
+    def __init__(self):
+        self.writes: deque[Write] = deque()
+        self.bucket = TokenBucket(CHANNEL_WRITES_PER_MINUTE, capacity=CHANNEL_BURST)
+        self.worker: asyncio.Task | None = None
+        self.queued = asyncio.Event()
+
+
+class Outbox:
+    """
+    Central queue for the bot's writes to Discord channels. Each channel's writes are sent in order by one worker,
+    paced ahead of time within the per-channel and global rate limits, so a monitoring loop only enqueues and moves on.
+    Consecutive plain messages to the same channel that are still waiting are merged into one.
+    """
+
+    def __init__(self):
+        self._channels: dict[int, _Channel] = {}
+        self._global = TokenBucket(GLOBAL_WRITES_PER_MINUTE, capacity=GLOBAL_BURST)
+        self.sent = 0
+        self.merged = 0
+        self.failed = 0
+
+    def send(self, channel, content: str, merge: bool = True) -> asyncio.Future:
+        """
+        Queues a message. The returned future resolves to the sent message; callers that do not need it never await it.
+        Pass merge=False for messages that are edited later, e.g. streamed replies.
+        """
+        return self._enqueue(channel.id, Write("send", channel, content, merge))
+
+    def delete(self, message) -> asyncio.Future:
+        return self._enqueue(message.channel.id, Write("delete", message))
+
+    def pending(self) -> int:
+        return sum(len(channel.writes) for channel in self._channels.values())
+
+    def _enqueue(self, channel_id: int, write: Write) -> asyncio.Future:
+        channel = self._channels.get(channel_id)
+        if channel is None:
+            channel = self._channels[channel_id] = _Channel()
+        if channel.writes and channel.writes[-1].absorb(write):
+            self.merged += 1
+        else:
+            channel.writes.append(write)
+        channel.queued.set()
+        if channel.worker is None:
+            channel.worker = asyncio.create_task(self._drain(channel_id, channel))
+        return write.futures[0]
+
+    async def _drain(self, channel_id: int, channel: _Channel):
+        try:
+            while True:
+                while channel.writes:
+                    delay = max(channel.bucket.delay_for(1), self._global.delay_for(1))
+                    if delay:
+                        # later writes keep merging into the queue while this one waits for its slot
+                        await asyncio.sleep(delay)
+                        continue
+                    channel.bucket.consume(1)
+                    self._global.consume(1)
+                    await self._perform(channel.writes.popleft())
+                # keep the bucket until it has refilled, a channel that writes again soon stays paced
+                refill = channel.bucket.delay_for(CHANNEL_BURST)
+                if not refill:
+                    return
+                channel.queued.clear()
+                try:
+                    await asyncio.wait_for(channel.queued.wait(), timeout=refill)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if self._channels.get(channel_id) is channel:
+                del self._channels[channel_id]
+            # writes queued while the worker was being cancelled are not sent
+            for write in channel.writes:
+                for future in write.futures:
+                    future.cancel()
+
+    async def _perform(self, write: Write):
+        try:
+            if write.kind == "send":
+                result = await write.target.send(content=write.content)
+                self.sent += 1
+            else:
+                result = await write.target.delete()
+        except Exception as error:
+            self.failed += 1
+            print(f"Discord {write.kind} failed: {error!r}")
+            for future in write.futures:
+                if not future.done():
+                    future.set_exception(error)
+                    future.exception()  # fire-and-forget callers never retrieve it
+            return
+        for future in write.futures:
+            if not future.done():
+                future.set_result(result)
+
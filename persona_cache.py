@@ -0,0 +1,66 @@
+import asyncio, time
+
+from response_cache import normalize
+from session_store import SQLiteStore
+
+
+class PersonaCache(SQLiteStore):
+    """
+    Remembers the one-line stance generated for a persona against an opponent on a topic, across restarts.
+    The most used stances are loaded into memory at startup, the rest are read from disk on demand.
+    """
+
+    schema = """CREATE TABLE IF NOT EXISTS stances (
+                persona TEXT NOT NULL,
+                opponent TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                stance TEXT NOT NULL,
+                uses INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (persona, opponent, topic)
+            )"""
+
+    def __init__(self, preload: int = 256, **kwargs):
+        super().__init__(**kwargs)
+        rows = self._execute(
+            "SELECT persona, opponent, topic, stance FROM stances ORDER BY uses DESC LIMIT ?",
+            (preload,),
+        )
+        self._stances = {(persona, opponent, topic): stance for persona, opponent, topic, stance in rows}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(persona: str, opponent: str, topic: str) -> tuple:
+        return normalize(persona), normalize(opponent), normalize(topic)
+
+    async def get(self, persona: str, opponent: str, topic: str) -> str | None:
+        key = self.key(persona, opponent, topic)
+        stance = self._stances.get(key)
+        if stance is None:
+            rows = await asyncio.to_thread(
+                self._execute,
+                "SELECT stance FROM stances WHERE persona = ? AND opponent = ? AND topic = ?",
+                key,
+            )
+            if not rows:
+                self.misses += 1
+                return None
+            stance = self._stances[key] = rows[0][0]
+
+        self.hits += 1
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE stances SET uses = uses + 1 WHERE persona = ? AND opponent = ? AND topic = ?",
+            key,
+        )
+        return stance
+
+    async def put(self, persona: str, opponent: str, topic: str, stance: str):
+        key = self.key(persona, opponent, topic)
+        self._stances[key] = stance
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT OR REPLACE INTO stances VALUES (?, ?, ?, ?, 1, ?)",
+            (*key, stance, time.time()),
+        )
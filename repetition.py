@@ -0,0 +1,93 @@
+import os, random, re, zlib
+from array import array
+
+# share of matching MinHash slots from which two messages count as the same point
+REPETITION_THRESHOLD = float(os.getenv("REPETITION_THRESHOLD", "0.5"))
+# messages shorter than this are too generic ("I disagree.") to be judged as repetition
+REPETITION_MIN_WORDS = int(os.getenv("REPETITION_MIN_WORDS", "8"))
+# earlier messages remembered per participant
+REPETITION_HISTORY = 100
+
+SHINGLE_SIZE = 2
+SIGNATURE_SIZE = 64
+_PRIME = (1 << 61) - 1
+# fixed seed: signatures are persisted with the session and must stay comparable after a restart
+_random = random.Random(20240601)
+_HASH_PARAMETERS = [
+    (_random.randrange(1, _PRIME), _random.randrange(0, _PRIME))
+    for _ in range(SIGNATURE_SIZE)
+]
+
+# passed to the fallacy check when a message repeats one earlier point
+REPETITION_HINT = "The last message closely restates a point its author already made earlier in the debate."
+# sent directly, without a model call, from the second repetition of the same point
+REPETITION_NUDGE = "{mention}, you've made this point before—what new evidence or angle distinguishes this from your earlier statement?"
+
+
+def shingles(text: str) -> set[int]:
+    """
+    Hashed word bigrams of the normalized text.
+    """
+    words = re.findall(r"[a-z0-9']+", text.lower())
+    return {
+        zlib.crc32(" ".join(words[i : i + SHINGLE_SIZE]).encode())
+        for i in range(max(1, len(words) - SHINGLE_SIZE + 1))
+    }
+
+
+def signature(text: str) -> array:
+    """
+    MinHash signature of the message, truncated to 32 bits per slot to keep it compact.
+    """
+    hashed = shingles(text)
+    return array(
+        "I",
+        (
+            min((a * shingle + b) % _PRIME for shingle in hashed) & 0xFFFFFFFF
+            for a, b in _HASH_PARAMETERS
+        ),
+    )
+
+
+def similarity(first: array, second: array) -> float:
+    """
+    Estimated Jaccard similarity of the two messages' shingle sets.
+    """
+    return sum(x == y for x, y in zip(first, second)) / SIGNATURE_SIZE
+
+
+class RepetitionIndex:
+    """
+    Per-session index of MinHash signatures of every participant's earlier messages,
+    used to spot a participant restating a point without new development.
+    New signatures are collected until take_unsaved() hands them to the session store.
+    """
+
+    def __init__(self, signatures: dict[int, list[bytes]] | None = None):
+        self._signatures: dict[int, list] = {
+            author: [array("I", entry) for entry in entries] for author, entries in (signatures or {}).items()
+        }
+        self._unsaved: list[tuple[int, bytes]] = []
+
+    def check(self, author_id: int, text: str) -> int:
+        """
+        Records the message and returns how many earlier messages by the same author it repeats.
+        """
+        if len(text.split()) < REPETITION_MIN_WORDS:
+            return 0
+        current = signature(text)
+        earlier = self._signatures.setdefault(author_id, [])
+        repeats = sum(
+            similarity(current, previous) >= REPETITION_THRESHOLD for previous in earlier
+        )
+        earlier.append(current)
+        del earlier[:-REPETITION_HISTORY]
+        self._unsaved.append((author_id, current.tobytes()))
+        return repeats
+
+    def take_unsaved(self) -> list[tuple[int, bytes]]:
+        """
+        The (author id, signature) pairs recorded since the last call.
+        """
+        unsaved, self._unsaved = self._unsaved, []
+        return unsaved
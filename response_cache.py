@@ -0,0 +1,78 @@
+import asyncio, hashlib, re
+from contextlib import asynccontextmanager
+
+from cachetools import TTLCache
+
+
+def normalize(text: str) -> str:
+    """
+    Folds away differences that do not change the meaning of a prompt: case, whitespace and trailing punctuation.
+    """
+    return re.sub(r"\s+", " ", text).strip().rstrip(".!?").lower()
+
+
+class CacheEntry:
+    """
+    Handed out by ResponseCache.single_flight(). `value` holds the cached or shared response,
+    or is None when the caller has to produce it and assign it.
+    """
+
+    def __init__(self, value: str | None = None):
+        self.value = value
+
+
+class ResponseCache:
+    """
+    Bounded cache of model responses keyed on the normalized prompt.
+    Entries expire after `ttl` seconds and the least recently used one is evicted when the cache is full.
+    Concurrent requests for the same key share one in-flight completion instead of each calling the model.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 3600):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.shared = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str, context: list[str], prompt_version: str) -> str:
+        digest = hashlib.sha256(prompt_version.encode())
+        for part in context + [text]:
+            digest.update(b"\0" + normalize(part).encode())
+        return digest.hexdigest()
+
+    @asynccontextmanager
+    async def single_flight(self, key: str):
+        """
+        Yields a CacheEntry. On a hit, or when an identical request is already in flight, the entry carries its response.
+        Otherwise the caller is the leader: whatever it assigns to `entry.value` is cached and shared with everyone who waited.
+        """
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            yield CacheEntry(cached)
+            return
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.shared += 1
+            yield CacheEntry(await asyncio.shield(pending))
+            return
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        entry = CacheEntry()
+        try:
+            yield entry
+        except BaseException:
+            future.set_exception(RuntimeError("The shared completion failed"))
+            future.exception()  # followers re-raise it, the leader does not need to
+            raise
+        else:
+            if entry.value is not None:
+                self._cache[key] = entry.value
+            future.set_result(entry.value)
+        finally:
+            self._in_flight.pop(key, None)
@@ -0,0 +1,155 @@
+import os, time
+from collections import deque
+
+import metrics
+from scheduler import DEFAULT_LIMITS, MODEL_LIMITS
+
+LARGE_MODEL = "llama-3.3-70b-versatile"
+SMALL_MODEL = "llama-3.1-8b-instant"
+
+# models that may serve each request type (the keys of intelligence.MAX_TOKENS), preferred first
+ROUTES = {
+    "verdict": (LARGE_MODEL, SMALL_MODEL),
+    "batch": (LARGE_MODEL, SMALL_MODEL),
+    "argue": (LARGE_MODEL, SMALL_MODEL),
+    "opponent": (LARGE_MODEL, SMALL_MODEL),
+    "persona": (LARGE_MODEL, SMALL_MODEL),
+    "stance": (SMALL_MODEL, LARGE_MODEL),
+    "summary": (SMALL_MODEL,),
+    "triage": (SMALL_MODEL,),
+}
+# seconds a request type may expect to wait (queueing included) before a smaller model is preferred
+LATENCY_BUDGETS = {
+    "argue": 4.0,
+    "opponent": 6.0,
+    "verdict": 8.0,
+    "batch": 10.0,
+    "persona": 20.0,
+    "stance": 20.0,
+}
+# consecutive failures that open a model's circuit breaker, and how long it stays open
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "30"))
+# recent calls kept per model for its error rate
+STATS_WINDOW = 50
+
+
+class ModelStats:
+    """
+    Live health of one model: smoothed latency, recent outcomes and its circuit breaker.
+    """
+
+    def __init__(self):
+        self.latency = 0.0
+        self.outcomes = deque(maxlen=STATS_WINDOW)
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+
+    def record(self, seconds: float, ok: bool):
+        self.outcomes.append(ok)
+        if ok:
+            self.latency = seconds if not self.latency else 0.8 * self.latency + 0.2 * seconds
+            self.consecutive_failures = 0
+            self.opened_at = None
+        else:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= BREAKER_FAILURES:
+                self.opened_at = time.monotonic()
+
+    @property
+    def open(self) -> bool:
+        """
+        True while the breaker is open. After the cooldown it is half-open: calls go through
+        and the first outcome closes or re-opens it.
+        """
+        return self.opened_at is not None and time.monotonic() - self.opened_at < BREAKER_COOLDOWN
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+
+class ModelRouter:
+    """
+    Picks the model serving each request from ROUTES, using live latency and error stats and the request size.
+    Requests move to the next model when the preferred one's breaker is open, or when its expected wait
+    exceeds the request type's latency budget and a model the request fits is expected to answer sooner.
+    """
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self._stats: dict[str, ModelStats] = {}
+        self.routed = metrics.registry.register(
+            metrics.Counter(
+                "logos_llm_routed_total", "Model chosen per request type.", ("kind", "model", "reason")
+            )
+        )
+        metrics.registry.register(
+            metrics.Gauge(
+                "logos_llm_breaker_open",
+                "1 while a model's circuit breaker is open.",
+                ("model",),
+                collect=lambda: {(model,): int(stats.open) for model, stats in self._stats.items()},
+            )
+        )
+
+    def stats(self, model: str) -> ModelStats:
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats[model] = ModelStats()
+        return stats
+
+    def expected_latency(self, model: str, tokens: int) -> float:
+        return self.stats(model).latency + self.scheduler.expected_delay(model, tokens)
+
+    @staticmethod
+    def fits(model: str, tokens: int) -> bool:
+        """
+        Whether a request is small enough for the model's token budget (at most half a minute's worth).
+        """
+        return tokens <= MODEL_LIMITS.get(model, DEFAULT_LIMITS)["tokens"] / 2
+
+    def route(self, kind: str, tokens: int, exclude: tuple = ()) -> tuple[str, str] | None:
+        """
+        Returns (model, reason) for a request, or None if every candidate is excluded.
+        """
+        candidates = [model for model in ROUTES[kind] if model not in exclude]
+        if not candidates:
+            return None
+        reason = "failover" if exclude else "preferred"
+        budget = LATENCY_BUDGETS.get(kind)
+        for position, model in enumerate(candidates):
+            last = position == len(candidates) - 1
+            if last:
+                break
+            if self.stats(model).open:
+                reason = "breaker"
+                continue
+            if position > 0 and not self.fits(model, tokens):
+                continue
+            if budget is not None:
+                expected = self.expected_latency(model, tokens)
+                if expected > budget and any(
+                    self.fits(other, tokens)
+                    and not self.stats(other).open
+                    and self.expected_latency(other, tokens) < expected
+                    for other in candidates[position + 1 :]
+                ):
+                    reason = "pressure"
+                    continue
+            break
+        self.routed.inc(kind, model, reason)
+        return model, reason
+
+    def record(self, model: str, seconds: float, ok: bool):
+        self.stats(model).record(seconds, ok)
+
+    def summary(self) -> dict:
+        return {
+            model: {
+                "latency": round(stats.latency, 3),
+                "error_rate": round(stats.error_rate, 3),
+                "breaker_open": stats.open,
+            }
+            for model, stats in self._stats.items()
+        }
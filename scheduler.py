@@ -0,0 +1,282 @@
+import asyncio, heapq, itertools, os, random, re, time
+from enum import IntEnum
+
+import groq
+import metrics
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+# requests and tokens per minute for each model, matching the Groq limits of our plan
+MODEL_LIMITS = {
+    "llama-3.3-70b-versatile": {"requests": 30, "tokens": 12000},
+    "llama-3.1-8b-instant": {"requests": 30, "tokens": 6000},
+}
+DEFAULT_LIMITS = {"requests": 30, "tokens": 6000}
+
+RETRYABLE_ERRORS = (
+    groq.RateLimitError,
+    groq.APITimeoutError,
+    groq.APIConnectionError,
+    groq.InternalServerError,
+)
+
+
+class Priority(IntEnum):
+    """
+    Scheduling lanes, lower values are served first.
+    """
+
+    INTERACTIVE = 0  # a user is waiting on a slash command
+    MONITOR = 1  # live debate threads
+    BACKGROUND = 2  # simulations and housekeeping
+
+
+# how many requests may wait in each lane before new ones are rejected
+LANE_DEPTHS = {
+    Priority.INTERACTIVE: 50,
+    Priority.MONITOR: 200,
+    Priority.BACKGROUND: 100,
+}
+
+
+class SchedulerBusy(RuntimeError):
+    """
+    Raised when a lane's queue is full and the request is shed instead of queued.
+    """
+
+
+def estimate_tokens(messages: list, max_tokens: int = 512) -> int:
+    """
+    A cheap estimate of the tokens a completion will use: ~4 characters per prompt token plus the output allowance.
+    """
+    prompt_characters = sum(len(message["content"]) for message in messages)
+    return prompt_characters // 4 + max_tokens
+
+
+class TokenBucket:
+    """
+    Refills continuously at `per_minute` units per minute up to `capacity` (by default a full minute's worth).
+    """
+
+    def __init__(self, per_minute: float, capacity: float | None = None):
+        self.capacity = capacity or per_minute
+        self.rate = per_minute / 60
+        self.available = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(
+            self.capacity, self.available + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def delay_for(self, amount: int) -> float:
+        """
+        Seconds until `amount` units are available, 0 if they are available now.
+        """
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0
+        return (amount - self.available) / self.rate
+
+    def consume(self, amount: int):
+        self._refill()
+        self.available -= min(amount, self.capacity)
+
+    def pause(self, seconds: float):
+        """
+        Empties the bucket so nothing is sent for roughly `seconds`, used when the server says we are over the limit.
+        """
+        self._refill()
+        self.available = min(self.available, -seconds * self.rate)
+
+
+def retry_after(error: BaseException) -> float | None:
+    """
+    Reads how long the server wants us to wait from the rate-limit headers of a failed request.
+    """
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    if "retry-after" in headers:
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            pass
+    # Groq reports resets as durations like "7.66s" or "2m59.56s"
+    reset = headers.get("x-ratelimit-reset-requests") or headers.get(
+        "x-ratelimit-reset-tokens"
+    )
+    if reset:
+        match = re.fullmatch(r"(?:(\d+)m)?([\d.]+)(ms|s)", reset)
+        if match:
+            minutes, value, unit = match.groups()
+            seconds = float(value) / 1000 if unit == "ms" else float(value)
+            return int(minutes or 0) * 60 + seconds
+    return None
+
+
+class _ModelLane:
+    def __init__(self, limits: dict):
+        self.requests = TokenBucket(limits["requests"])
+        self.tokens = TokenBucket(limits["tokens"])
+        self.waiting: list = []  # heap of (priority, sequence)
+
+    def delay_for(self, tokens: int) -> float:
+        return max(self.requests.delay_for(1), self.tokens.delay_for(tokens))
+
+
+class GroqScheduler:
+    """
+    Sits in front of the Groq client and decides when each completion may be sent.
+    Requests are admitted per model in priority order, within the model's request/token budget and a global concurrency cap.
+    Rate-limited, timed-out and failed requests are retried with jittered backoff, honouring the server's retry hints.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = int(os.getenv("GROQ_MAX_CONCURRENCY", "8")),
+        max_attempts: int = 4,
+        limits: dict = MODEL_LIMITS,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.limits = limits
+        self._lanes: dict[str, _ModelLane] = {}
+        self._active = 0
+        self._sequence = itertools.count()
+        self._condition = asyncio.Condition()
+        self.admitted = 0
+        self.completed = 0
+        self.retries = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _lane(self, model: str) -> _ModelLane:
+        lane = self._lanes.get(model)
+        if lane is None:
+            lane = _ModelLane(self.limits.get(model, DEFAULT_LIMITS))
+            self._lanes[model] = lane
+        return lane
+
+    async def _acquire(self, model: str, tokens: int, priority: Priority):
+        lane = self._lane(model)
+        depth = sum(1 for waiting_priority, _ in lane.waiting if waiting_priority == priority)
+        if depth >= LANE_DEPTHS[priority]:
+            raise SchedulerBusy(f"{priority.name} queue for {model} is full")
+
+        ticket = (priority, next(self._sequence))
+        queued_at = time.monotonic()
+        async with self._condition:
+            heapq.heappush(lane.waiting, ticket)
+            try:
+                while True:
+                    if lane.waiting[0] == ticket and self._active < self.max_concurrency:
+                        delay = lane.delay_for(tokens)
+                        if delay == 0:
+                            break
+                    else:
+                        delay = None
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                lane.waiting.remove(ticket)
+                heapq.heapify(lane.waiting)
+                self._condition.notify_all()
+
+            lane.requests.consume(1)
+            lane.tokens.consume(tokens)
+            self._active += 1
+
+        waited = time.monotonic() - queued_at
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    async def _release(self):
+        async with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def _wait_strategy(self, retry_state) -> float:
+        error = retry_state.outcome.exception()
+        hinted = retry_after(error)
+        if hinted is not None:
+            # the paused bucket holds back every request for this model, the retry only adds jitter on top
+            self._lane(retry_state.kwargs["model"]).requests.pause(hinted)
+            return random.uniform(0, 1)
+        return wait_random_exponential(multiplier=0.5, max=20)(retry_state)
+
+    async def submit(self, call, *, model: str, tokens: int, priority: Priority, on_attempt=None):
+        """
+        Runs `call()` (a coroutine function making one Groq request) once the scheduler admits it.
+        `on_attempt(seconds)` is called after every attempt with its service time, admission and retry waits excluded.
+        """
+
+        async def attempt(model: str):
+            await self._acquire(model, tokens, priority)
+            started = time.monotonic()
+            outcome = "error"
+            try:
+                result = await call()
+                outcome = "ok"
+                return result
+            except RETRYABLE_ERRORS as error:
+                outcome = type(error).__name__
+                raise
+            finally:
+                service = time.monotonic() - started
+                metrics.llm_latency.observe(model, outcome, value=service)
+                if on_attempt is not None:
+                    on_attempt(service)
+                await self._release()
+
+        retrying = AsyncRetrying(
+            retry=retry_if_exception_type(RETRYABLE_ERRORS),
+            stop=stop_after_attempt(self.max_attempts),
+            wait=self._wait_strategy,
+            before_sleep=self._count_retry,
+            reraise=True,
+        )
+        result = await retrying(attempt, model=model)
+        self.completed += 1
+        return result
+
+    def _count_retry(self, retry_state):
+        self.retries += 1
+
+    def expected_delay(self, model: str, tokens: int) -> float:
+        """
+        Rough seconds a new request would wait for admission: the rate-limit delay plus the queue ahead of it
+        drained at the model's request rate.
+        """
+        lane = self._lane(model)
+        return lane.delay_for(tokens) + len(lane.waiting) / lane.requests.rate
+
+    def stats(self) -> dict:
+        """
+        Current queue depths per model and lane, and how long admitted requests waited.
+        """
+        return {
+            "active": self._active,
+            "completed": self.completed,
+            "retries": self.retries,
+            "average_wait": self.total_wait / self.admitted if self.admitted else 0.0,
+            "max_wait": self.max_wait,
+            "queue_depth": {
+                model: {
+                    priority.name: sum(1 for p, _ in lane.waiting if p == priority)
+                    for priority in Priority
+                }
+                for model, lane in self._lanes.items()
+            },
+        }
@@ -0,0 +1,38 @@
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+
+class FallacyVerdict(BaseModel):
+    """
+    The debate monitor's decision on the most recent message.
+    """
+
+    intervene: bool
+    question: str | None = None
+
+    @field_validator("question")
+    @classmethod
+    def blank_is_none(cls, question: str | None) -> str | None:
+        return question.strip() or None if question else None
+
+
+class MessageVerdict(FallacyVerdict):
+    message: int
+    intervene: bool = False
+
+
+class BatchVerdicts(BaseModel):
+    """
+    Verdicts for a burst of messages judged in one request.
+    """
+
+    verdicts: list[MessageVerdict] = Field(default_factory=list)
+
+
+def parse(model: type[BaseModel], content: str) -> BaseModel:
+    """
+    Validates a JSON model reply, raising RuntimeError like the other failed calls in intelligence.py.
+    """
+    try:
+        return model.model_validate_json(content)
+    except ValidationError as error:
+        raise RuntimeError("Malformed model output") from error
@@ -0,0 +1,164 @@
+import asyncio, json, os, sqlite3, threading, time
+
+DEFAULT_DB_PATH = os.getenv("LOGOS_DB_PATH", "logos.db")
+
+
+class SQLiteStore:
+    """
+    Shared plumbing for the stores kept in the bot's SQLite database.
+    Queries go through `_execute`, which async callers run in a worker thread so the event loop never blocks on disk I/O.
+    """
+
+    schema = ""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(self.schema)
+        self._connection.commit()
+
+    def _execute(self, query: str, parameters: tuple = ()):
+        with self._lock:
+            rows = self._connection.execute(query, parameters).fetchall()
+            self._connection.commit()
+            return rows
+
+
+class SessionStore(SQLiteStore):
+    """
+    SQLite-backed store for the state of live debate sessions so they survive a restart.
+    Each session is a single row keyed by its thread id; every state change overwrites only that row.
+    The repetition signatures of a debate grow with every message, they are appended to their own table instead.
+    """
+
+    schema = """CREATE TABLE IF NOT EXISTS sessions (
+                thread_id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                guild_id INTEGER,
+                topic TEXT NOT NULL,
+                state TEXT NOT NULL,
+                active INTEGER NOT NULL DEFAULT 1,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS signatures (
+                thread_id INTEGER NOT NULL,
+                author_id INTEGER NOT NULL,
+                signature BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS signatures_by_author ON signatures (thread_id, author_id)"""
+
+    async def create(self, thread_id: int, kind: str, guild_id: int, topic: str, state: dict):
+        now = time.time()
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, 1, ?, ?)",
+            (thread_id, kind, guild_id, topic, json.dumps(state), now, now),
+        )
+
+    async def save(self, thread_id: int, state: dict, signatures: list[tuple[int, bytes]] = (), keep: int = 0):
+        """
+        Persists the latest state of a session. Called after every turn.
+        New (author id, signature) pairs of a debate are appended in the same transaction,
+        keeping only each author's newest `keep`.
+        """
+        await asyncio.to_thread(self._save, thread_id, json.dumps(state), signatures, keep)
+
+    def _save(self, thread_id: int, state: str, signatures: list, keep: int):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE sessions SET state = ?, updated_at = ? WHERE thread_id = ?",
+                (state, time.time(), thread_id),
+            )
+            self._connection.executemany(
+                "INSERT INTO signatures VALUES (?, ?, ?)",
+                [(thread_id, author_id, signature) for author_id, signature in signatures],
+            )
+            for author_id in {author_id for author_id, _ in signatures}:
+                self._connection.execute(
+                    """DELETE FROM signatures WHERE thread_id = ? AND author_id = ? AND rowid NOT IN (
+                        SELECT rowid FROM signatures WHERE thread_id = ? AND author_id = ? ORDER BY rowid DESC LIMIT ?
+                    )""",
+                    (thread_id, author_id, thread_id, author_id, keep),
+                )
+
+    async def close(self, thread_id: int):
+        """
+        Marks a session as finished so it is not resumed on the next start.
+        """
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE sessions SET active = 0, updated_at = ? WHERE thread_id = ?",
+            (time.time(), thread_id),
+        )
+        await asyncio.to_thread(self._execute, "DELETE FROM signatures WHERE thread_id = ?", (thread_id,))
+
+    async def load_signatures(self, thread_id: int) -> dict[int, list[bytes]]:
+        """
+        The stored signatures of a debate per author, oldest first.
+        """
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT author_id, signature FROM signatures WHERE thread_id = ? ORDER BY rowid",
+            (thread_id,),
+        )
+        signatures = {}
+        for author_id, signature in rows:
+            signatures.setdefault(author_id, []).append(signature)
+        return signatures
+
+    async def load_active(self) -> list[dict]:
+        """
+        Returns every session that was still running when the bot last stopped.
+        """
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT thread_id, kind, guild_id, topic, state FROM sessions WHERE active = 1",
+        )
+        return [self._record(row) for row in rows]
+
+    async def load(self, thread_id: int) -> dict | None:
+        """
+        Returns the stored session of a thread if it is still active.
+        """
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT thread_id, kind, guild_id, topic, state FROM sessions WHERE thread_id = ? AND active = 1",
+            (thread_id,),
+        )
+        return self._record(rows[0]) if rows else None
+
+    @staticmethod
+    def _record(row: tuple) -> dict:
+        thread_id, kind, guild_id, topic, state = row
+        return {
+            "thread_id": thread_id,
+            "kind": kind,
+            "guild_id": guild_id,
+            "topic": topic,
+            "state": json.loads(state),
+        }
+
+
+class SettingsStore(SQLiteStore):
+    """
+    Small values kept across restarts, e.g. the hash of the command tree that was last synced.
+    """
+
+    schema = """CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )"""
+
+    async def get(self, key: str) -> str | None:
+        rows = await asyncio.to_thread(
+            self._execute, "SELECT value FROM settings WHERE key = ?", (key,)
+        )
+        return rows[0][0] if rows else None
+
+    async def set(self, key: str, value: str):
+        await asyncio.to_thread(
+            self._execute, "INSERT OR REPLACE INTO settings VALUES (?, ?)", (key, value)
+        )
@@ -0,0 +1,66 @@
+import os
+
+
+def parse_shard_ids(value: str) -> list[int]:
+    """
+    Parses shard lists like "0-3,8,10-11".
+    """
+    shard_ids = []
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-")
+            shard_ids.extend(range(int(first), int(last) + 1))
+        else:
+            shard_ids.append(int(part))
+    return shard_ids
+
+
+def shard_for_guild(guild_id: int, shard_count: int) -> int:
+    """
+    The shard Discord routes a guild's events to, see the sharding formula in the Discord API docs.
+    """
+    return (guild_id >> 22) % shard_count
+
+
+def split_shards(shard_count: int, workers: int) -> list[str]:
+    """
+    Splits shards 0..shard_count-1 into contiguous ranges, one per worker process.
+    """
+    ranges = []
+    start = 0
+    for worker in range(workers):
+        size = shard_count // workers + (worker < shard_count % workers)
+        ranges.append(f"{start}-{start + size - 1}")
+        start += size
+    return ranges
+
+
+class ShardConfig:
+    """
+    The shards this process connects, read from SHARD_COUNT and SHARD_IDS.
+    Without them Discord picks the shard count and this process runs all of them.
+    """
+
+    def __init__(self):
+        count = os.getenv("SHARD_COUNT")
+        ids = os.getenv("SHARD_IDS")
+        self.shard_count = int(count) if count else None
+        self.shard_ids = parse_shard_ids(ids) if ids and count else None
+
+    def owns(self, guild_id: int | None) -> bool:
+        """
+        Whether sessions in this guild belong to this process.
+        """
+        if self.shard_ids is None or guild_id is None:
+            return True
+        return shard_for_guild(guild_id, self.shard_count) in self.shard_ids
+
+    @property
+    def syncs_commands(self) -> bool:
+        """
+        Only the process running shard 0 syncs the (global) command tree.
+        """
+        return self.shard_ids is None or 0 in self.shard_ids
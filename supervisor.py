@@ -0,0 +1,172 @@
+import asyncio, os, random, time
+from collections import Counter
+
+# live sessions allowed in this process and in a single guild
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "1000"))
+MAX_SESSIONS_PER_GUILD = int(os.getenv("MAX_SESSIONS_PER_GUILD", "25"))
+# sessions whose thread has seen no message for this many seconds are stopped
+SESSION_IDLE_TIMEOUT = float(os.getenv("SESSION_IDLE_TIMEOUT", "7200"))
+# crashed sessions are restarted after 2, 4, 8, ... seconds, up to this many times in a row
+MAX_RESTARTS = 5
+RESTART_BACKOFF = 2.0
+RESTART_BACKOFF_MAX = 120.0
+# a session that ran this long before crashing starts counting its restarts from zero again
+HEALTHY_RUNTIME = 300.0
+
+
+class SessionLimitReached(RuntimeError):
+    """
+    Raised when a new session would exceed the global or per-guild cap.
+    """
+
+
+class SupervisedSession:
+    """
+    Registry entry of one live session. `restart()` returns a fresh coroutine continuing from the stored state,
+    or None if the session cannot be continued.
+    """
+
+    def __init__(self, thread_id: int, guild_id: int | None, kind: str, restart):
+        self.thread_id = thread_id
+        self.guild_id = guild_id
+        self.kind = kind
+        self.restart = restart
+        self.last_activity = time.monotonic()
+        self.task: asyncio.Task | None = None
+        self.restarts = 0
+
+
+class SessionSupervisor:
+    """
+    Owns the task of every live session: holds strong references, enforces the session caps,
+    stops sessions that went idle or whose thread is gone, restarts crashed ones with backoff
+    and cancels everything on shutdown.
+    `on_stop(thread_id)` is awaited when a session is stopped for good (idle, thread gone, too many crashes),
+    so the caller can mark it finished.
+    """
+
+    def __init__(
+        self,
+        on_stop=None,
+        max_sessions: int = MAX_SESSIONS,
+        max_per_guild: int = MAX_SESSIONS_PER_GUILD,
+        idle_timeout: float = SESSION_IDLE_TIMEOUT,
+    ):
+        self.on_stop = on_stop
+        self.max_sessions = max_sessions
+        self.max_per_guild = max_per_guild
+        self.idle_timeout = idle_timeout
+        self._sessions: dict[int, SupervisedSession] = {}
+        self._per_guild = Counter()
+        self._reaper: asyncio.Task | None = None
+        self.evicted = 0
+        self.crashed = 0
+
+    def __contains__(self, thread_id: int) -> bool:
+        return thread_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def has_capacity(self, guild_id: int | None) -> bool:
+        return len(self._sessions) < self.max_sessions and (
+            guild_id is None or self._per_guild[guild_id] < self.max_per_guild
+        )
+
+    def start(self, thread_id: int, guild_id: int | None, kind: str, session, restart=lambda: None):
+        """
+        Runs the `session` coroutine under supervision. Raises SessionLimitReached (closing the coroutine) when full.
+        """
+        if thread_id in self._sessions:
+            session.close()
+            return
+        if not self.has_capacity(guild_id):
+            session.close()
+            raise SessionLimitReached(f"No capacity for a new {kind} session in guild {guild_id}")
+
+        entry = SupervisedSession(thread_id, guild_id, kind, restart)
+        self._sessions[thread_id] = entry
+        self._per_guild[guild_id] += 1
+        entry.task = asyncio.create_task(self._run(entry, session), name=f"{kind}:{thread_id}")
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+    def touch(self, thread_id: int):
+        """
+        Records activity in a session's thread, postponing its idle eviction.
+        """
+        entry = self._sessions.get(thread_id)
+        if entry is not None:
+            entry.last_activity = time.monotonic()
+
+    async def stop(self, thread_id: int):
+        """
+        Stops a session for good, e.g. because its thread was archived or deleted.
+        """
+        entry = self._sessions.get(thread_id)
+        if entry is None:
+            return
+        entry.task.cancel()
+        await asyncio.gather(entry.task, return_exceptions=True)
+        if self.on_stop is not None:
+            await self.on_stop(thread_id)
+
+    async def _run(self, entry: SupervisedSession, session):
+        try:
+            while session is not None:
+                started = time.monotonic()
+                try:
+                    await session
+                    return
+                except Exception as error:
+                    self.crashed += 1
+                    if time.monotonic() - started > HEALTHY_RUNTIME:
+                        entry.restarts = 0
+                    entry.restarts += 1
+                    if entry.restarts > MAX_RESTARTS:
+                        print(f"Session {entry.thread_id} crashed {MAX_RESTARTS} times in a row, stopping it: {error!r}")
+                        break
+                    delay = min(RESTART_BACKOFF_MAX, RESTART_BACKOFF * 2 ** (entry.restarts - 1))
+                    print(f"Session {entry.thread_id} crashed ({error!r}), restarting in {delay:.0f}s")
+                    await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+                    session = entry.restart()
+            if self.on_stop is not None:
+                await self.on_stop(entry.thread_id)
+        finally:
+            self._sessions.pop(entry.thread_id, None)
+            self._per_guild[entry.guild_id] -= 1
+            if self._per_guild[entry.guild_id] <= 0:
+                del self._per_guild[entry.guild_id]
+
+    async def _reap_idle(self):
+        while True:
+            await asyncio.sleep(min(60, self.idle_timeout))
+            deadline = time.monotonic() - self.idle_timeout
+            idle = [
+                thread_id
+                for thread_id, entry in self._sessions.items()
+                if entry.last_activity < deadline
+            ]
+            for thread_id in idle:
+                self.evicted += 1
+                await self.stop(thread_id)
+            if idle:
+                print(f"Stopped {len(idle)} idle sessions, {len(self._sessions)} still running.")
+
+    async def shutdown(self):
+        """
+        Cancels every session without marking it finished, so they are resumed on the next start.
+        """
+        if self._reaper is not None:
+            self._reaper.cancel()
+        tasks = [entry.task for entry in self._sessions.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "sessions": Counter(entry.kind for entry in self._sessions.values()),
+            "evicted": self.evicted,
+            "crashed": self.crashed,
+        }
@@ -0,0 +1,6 @@
+import os, sys, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# the bot's stores are opened at import time, keep them away from real data
+os.environ.setdefault("LOGOS_DB_PATH", os.path.join(tempfile.mkdtemp(), "logos.db"))
+os.environ.setdefault("JOURNAL_DIR", "")
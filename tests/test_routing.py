@@ -0,0 +1,110 @@
+import asyncio
+
+import groq, httpx, pytest
+
+import intelligence
+from router import LARGE_MODEL, SMALL_MODEL, ModelRouter
+from scheduler import GroqScheduler, Priority, SchedulerBusy
+
+REQUEST = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+
+
+class FakeScheduler:
+    """
+    Runs every call at once, or raises `busy` for the given models as a full lane would.
+    """
+
+    def __init__(self, busy: tuple = ()):
+        self.busy = busy
+        self.submitted = []
+
+    async def submit(self, call, *, model: str, tokens: int, priority: Priority, on_attempt=None):
+        self.submitted.append(model)
+        # lets the test's timeout cancel an endless failover instead of hanging
+        await asyncio.sleep(0)
+        if model in self.busy:
+            raise SchedulerBusy(f"{priority.name} queue for {model} is full")
+        return await call()
+
+    def expected_delay(self, model: str, tokens: int) -> float:
+        return 0.0
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    def install(**options):
+        scheduler = FakeScheduler(**options)
+        monkeypatch.setattr(intelligence, "scheduler", scheduler)
+        monkeypatch.setattr(intelligence, "router", ModelRouter(scheduler))
+        return scheduler
+
+    return install
+
+
+def submit(request):
+    return asyncio.run(
+        asyncio.wait_for(intelligence.submit_routed("verdict", request, 100, Priority.MONITOR), timeout=5)
+    )
+
+
+def test_failing_request_fails_over_once(scheduler):
+    fake = scheduler()
+
+    async def request(model):
+        raise groq.APIConnectionError(request=REQUEST)
+
+    with pytest.raises(groq.APIConnectionError):
+        submit(request)
+    assert fake.submitted == [LARGE_MODEL, SMALL_MODEL]
+    assert intelligence.router.stats(LARGE_MODEL).consecutive_failures == 1
+    assert intelligence.router.stats(SMALL_MODEL).consecutive_failures == 1
+
+
+def test_failover_serves_from_the_other_model(scheduler):
+    fake = scheduler(busy=(LARGE_MODEL,))
+
+    async def request(model):
+        return model
+
+    assert submit(request) == (SMALL_MODEL, SMALL_MODEL)
+    assert fake.submitted == [LARGE_MODEL, SMALL_MODEL]
+
+
+def test_busy_lanes_do_not_open_breakers(scheduler):
+    fake = scheduler(busy=(LARGE_MODEL, SMALL_MODEL))
+
+    async def request(model):
+        raise AssertionError("a busy lane never runs the request")
+
+    with pytest.raises(SchedulerBusy):
+        submit(request)
+    assert fake.submitted == [LARGE_MODEL, SMALL_MODEL]
+    assert not intelligence.router.stats(LARGE_MODEL).outcomes
+    assert not intelligence.router.stats(SMALL_MODEL).outcomes
+
+
+def test_rejected_requests_do_not_open_breakers(scheduler):
+    scheduler()
+    response = httpx.Response(400, request=REQUEST)
+
+    async def request(model):
+        raise groq.BadRequestError("context too long", response=response, body=None)
+
+    with pytest.raises(groq.BadRequestError):
+        submit(request)
+    assert intelligence.router.stats(LARGE_MODEL).consecutive_failures == 0
+    assert intelligence.router.stats(SMALL_MODEL).consecutive_failures == 0
+
+
+def test_router_latency_excludes_queueing(monkeypatch):
+    scheduler = GroqScheduler()
+    monkeypatch.setattr(intelligence, "scheduler", scheduler)
+    monkeypatch.setattr(intelligence, "router", ModelRouter(scheduler))
+    # the request waits for the paused rate bucket before it is sent
+    scheduler._lane(LARGE_MODEL).requests.pause(0.3)
+
+    async def request(model):
+        return model
+
+    assert submit(request) == (LARGE_MODEL, LARGE_MODEL)
+    assert intelligence.router.stats(LARGE_MODEL).latency < 0.1
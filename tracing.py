@@ -0,0 +1,175 @@
+"""
+Lightweight tracing for the hot path: spans around model calls and Discord requests, grouped per session.
+
+Every span's duration is recorded in the `logos_span_seconds` histogram. A sampled share of traces is also written
+as JSON lines (one per span) by a background logging thread, so the event loop never waits on log output.
+"""
+
+import functools, inspect, json, logging, logging.handlers, os, queue, random, sys, time, uuid
+from contextvars import ContextVar
+
+import metrics
+
+# share of traces (a debate turn, a /argue call, ...) whose spans are exported
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+# JSON lines are appended here, stderr when unset
+TRACE_FILE = os.getenv("TRACE_FILE")
+
+_session: ContextVar[str | None] = ContextVar("trace_session", default=None)
+_current: ContextVar["Span | None"] = ContextVar("trace_span", default=None)
+_exporter = None
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "session", "sampled", "attributes", "started", "timestamp")
+
+    def __init__(self, name: str, parent: "Span | None", attributes: dict):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        if parent is None:
+            self.trace_id = uuid.uuid4().hex
+            self.parent_id = None
+            self.sampled = random.random() < TRACE_SAMPLE_RATE
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self.sampled = parent.sampled
+        self.session = _session.get()
+        self.attributes = attributes
+        self.timestamp = time.time()
+        self.started = time.perf_counter()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self, error: BaseException | None = None):
+        duration = time.perf_counter() - self.started
+        metrics.span_latency.observe(self.name, value=duration)
+        if not self.sampled:
+            return
+        export(
+            {
+                "trace": self.trace_id,
+                "span": self.span_id,
+                "parent": self.parent_id,
+                "session": self.session,
+                "name": self.name,
+                "start": self.timestamp,
+                "duration_ms": round(duration * 1000, 3),
+                "error": type(error).__name__ if error else None,
+                **({"attributes": self.attributes} if self.attributes else {}),
+            }
+        )
+
+
+class span:
+    """
+    Times the enclosed block as a child of the current span, or as a new trace when there is none.
+
+        with tracing.span("debate.turn", messages=3):
+            ...
+    """
+
+    def __init__(self, name: str, **attributes):
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self) -> Span:
+        self.span = Span(self.name, _current.get(), self.attributes)
+        self._token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, error_type, error, traceback):
+        _current.reset(self._token)
+        self.span.finish(error)
+
+
+class _NoSpan:
+    def set(self, **attributes):
+        pass
+
+
+def current_span() -> Span | _NoSpan:
+    """
+    The innermost active span, e.g. to attach what was learned during a call to it.
+    """
+    return _current.get() or _NoSpan()
+
+
+def current_session() -> str | None:
+    """
+    The correlation id bound with bind_session() in the current task, if any.
+    """
+    return _session.get()
+
+
+def bind_session(session_id: str):
+    """
+    Tags every span started from the current task (and the tasks it creates) with this correlation id.
+    """
+    _session.set(session_id)
+
+
+def traced(name: str | None = None):
+    """
+    Decorator wrapping every call of an async function (or async generator) in a span.
+    """
+
+    def decorate(function):
+        span_name = name or f"{function.__module__}.{function.__name__}"
+
+        if inspect.isasyncgenfunction(function):
+
+            @functools.wraps(function)
+            async def generator(*args, **kwargs):
+                # not made current: the consumer runs between the chunks, its own calls are not part of this span
+                current = Span(span_name, _current.get(), {})
+                error = None
+                try:
+                    async for item in function(*args, **kwargs):
+                        yield item
+                except BaseException as raised:
+                    error = raised
+                    raise
+                finally:
+                    current.finish(error)
+
+            return generator
+
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            with span(span_name):
+                return await function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def set_exporter(exporter):
+    """
+    Replaces the JSON-lines exporter with `exporter(record: dict)`, e.g. to forward spans to a collector.
+    It is called on the event loop and must not block.
+    """
+    global _exporter
+    _exporter = exporter
+
+
+def export(record: dict):
+    if _exporter is None:
+        set_exporter(_log_exporter())
+    _exporter(record)
+
+
+def _log_exporter():
+    """
+    Queues records for a logging thread that writes them to TRACE_FILE (or stderr).
+    """
+    handler = logging.FileHandler(TRACE_FILE) if TRACE_FILE else logging.StreamHandler(sys.stderr)
+    records = queue.SimpleQueue()
+    logging.handlers.QueueListener(records, handler).start()
+    logger = logging.getLogger("logos.trace")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    return lambda record: logger.info(json.dumps(record))
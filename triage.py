@@ -0,0 +1,87 @@
+import os, re
+
+# an 8B score (0-100) at or above this escalates a message to the full 70B fallacy check
+TRIAGE_THRESHOLD = int(os.getenv("TRIAGE_THRESHOLD", "50"))
+# messages shorter than this, with no fallacy markers, are never escalated
+TRIAGE_MIN_WORDS = int(os.getenv("TRIAGE_MIN_WORDS", "6"))
+# print the hit/escalation ratios after this many triaged messages
+TRIAGE_LOG_EVERY = int(os.getenv("TRIAGE_LOG_EVERY", "50"))
+
+# phrasing that very often comes with the Tier 1 fallacies, these skip the 8B pass and escalate directly
+FALLACY_MARKERS = re.compile(
+    r"\b("
+    r"you(?:'re| are) (?:an? )?(?:idiot|moron|stupid|ignorant|naive|clueless|liar|troll)"
+    r"|people like you|typical \w+ (?:argument|logic)"
+    r"|so you(?:'re| are) saying|so what you(?:'re| are) saying"
+    r"|either (?:we|you|they)\b.{0,80}\bor\b|there are only two"
+    r"|(?:experts|scientists|everyone|everybody) (?:agree|says?|knows?)"
+    r"|because i said so|it'?s true because"
+    r")",
+    re.IGNORECASE,
+)
+
+TRIAGE_PROMPT = """You screen debate messages for a fallacy checker.
+Rate from 0 to 100 how likely the LAST message commits a clear, material logical fallacy:
+ad hominem, strawman, circular reasoning, false dilemma, appeal to authority, moving the goalposts, red herring or repetition without development.
+Questions, clarifications, self-defence and merely weak or unsupported claims score low.
+Reply with the number only."""
+
+
+def quick_verdict(text: str) -> bool | None:
+    """
+    Local heuristics run before any model call.
+    Returns True to escalate straight away, False to skip the message, None when the 8B model has to decide.
+    """
+    if FALLACY_MARKERS.search(text):
+        return True
+    if len(text.split()) < TRIAGE_MIN_WORDS:
+        return False
+    return None
+
+
+def parse_score(reply: str) -> int | None:
+    match = re.search(r"\d{1,3}", reply)
+    return int(match.group()) if match else None
+
+
+class TriageStats:
+    """
+    Counts what the triage stage decided so the thresholds can be tuned from the logs.
+    """
+
+    def __init__(self):
+        self.triaged = 0
+        self.heuristic_escalations = 0
+        self.heuristic_skips = 0
+        self.model_checks = 0
+        self.escalations = 0
+        self.interventions = 0
+
+    def record(self, escalated: bool, by_heuristic: bool):
+        self.triaged += 1
+        if by_heuristic:
+            if escalated:
+                self.heuristic_escalations += 1
+            else:
+                self.heuristic_skips += 1
+        else:
+            self.model_checks += 1
+        if escalated:
+            self.escalations += 1
+        if self.triaged % TRIAGE_LOG_EVERY == 0:
+            print(self.summary())
+
+    def record_intervention(self):
+        """
+        Called when an escalated message really was a fallacy, i.e. the model returned intervene=true.
+        """
+        self.interventions += 1
+
+    def summary(self) -> str:
+        escalation_ratio = self.escalations / self.triaged if self.triaged else 0
+        hit_ratio = self.interventions / self.escalations if self.escalations else 0
+        return (
+            f"Triage: {self.triaged} messages, {escalation_ratio:.0%} escalated "
+            f"({self.heuristic_escalations} by markers, {self.heuristic_skips} skipped as short, "
+            f"{self.model_checks} scored by 8B), {hit_ratio:.0%} of escalations were fallacies"
+        )